@@ -0,0 +1,157 @@
+import threading
+from stable_baselines3 import PPO
+from stable_baselines3.common.callbacks import BaseCallback
+from flappy_env import DECISION_INTERVAL
+from vec_flappy_env import VecFlappyEnv
+from shared_memory_vec_env import SharedMemoryVecEnv
+
+
+class _SnapshotCallback(BaseCallback):
+    def __init__(self, trainer):
+        super().__init__()
+        self.trainer = trainer
+
+    def _on_step(self):
+        # Returning False makes PPO.learn stop early. Checked first, so
+        # num_timesteps no longer changes once stop() was called.
+        if self.trainer.stop_event.is_set():
+            return False
+        self.trainer.num_timesteps = self.num_timesteps
+        return True
+
+    def _on_rollout_start(self):
+        weights = self.trainer.take_pending_weights()
+        if weights is not None:
+            self.model.policy.load_state_dict(weights)
+
+    def _on_rollout_end(self):
+        snapshot = self.trainer.publish_snapshot(self.model.policy)
+        self.trainer.maybe_checkpoint(snapshot)
+
+
+class BackgroundTrainer:
+    """Runs PPO.learn on headless games in a worker thread.
+
+    The game window never touches the learner directly; it polls
+    latest_snapshot() between frames for a copy of the current policy weights.
+    game_settings are Simulation keyword arguments, so the learner plays the
+    same physics as the game window.
+    """
+
+    def __init__(
+        self,
+        learning_rate,
+        training_steps,
+        num_envs=8,
+        initial_policy=None,
+        num_workers=0,
+        action_repeat=DECISION_INTERVAL,
+        checkpoints=None,
+        checkpoint_interval=10000,
+        step_offset=0,
+        game_settings=None,
+    ):
+        self.training_steps = training_steps
+        # Optional CheckpointSaver that gets a snapshot every checkpoint_interval steps.
+        # step_offset continues the step tags of earlier runs.
+        self.checkpoints = checkpoints
+        self.checkpoint_interval = checkpoint_interval
+        self.step_offset = step_offset
+        self.last_checkpoint_step = 0
+        # Each transition spans one decision interval, matching the decision gate
+        # of the FlappyEnv that plays the published policy in the game window
+        game_settings = game_settings or {}
+        if num_workers > 0:
+            # Spread the games over worker processes to use more cores
+            self.env = SharedMemoryVecEnv(
+                num_workers,
+                envs_per_worker=max(1, num_envs // num_workers),
+                action_repeat=action_repeat,
+                **game_settings,
+            )
+        else:
+            self.env = VecFlappyEnv(
+                num_envs, action_repeat=action_repeat, **game_settings
+            )
+        # Short rollouts keep the snapshots shown in the game window fresh
+        self.model = PPO(
+            "MlpPolicy",
+            self.env,
+            verbose=0,
+            learning_rate=learning_rate,
+            n_steps=256,
+        )
+        if initial_policy is not None:
+            # Continue from the weights currently shown in the game
+            self.model.policy.load_state_dict(initial_policy.state_dict())
+
+        self.num_timesteps = 0
+        self.stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._pending_weights = None
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self, wait=True):
+        """Ask the learner to stop; without wait, join() it later.
+
+        Stopping waits for the current PPO update, which can take seconds.
+        """
+        self.stop_event.set()
+        if wait:
+            self.join()
+
+    def join(self):
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        self.model.learn(
+            total_timesteps=self.training_steps, callback=_SnapshotCallback(self)
+        )
+        self.maybe_checkpoint(self.publish_snapshot(self.model.policy), final=True)
+        self.env.close()
+
+    def load_weights(self, state, step_offset=None):
+        """Continue learning from state, swapped in before the next rollout."""
+        with self._lock:
+            self._pending_weights = state
+            if step_offset is not None:
+                self.step_offset = step_offset
+            self._snapshot = None  # Older than state, must not replace it in the game
+
+    def take_pending_weights(self):
+        with self._lock:
+            weights, self._pending_weights = self._pending_weights, None
+        return weights
+
+    def publish_snapshot(self, policy):
+        snapshot = {
+            key: value.detach().clone() for key, value in policy.state_dict().items()
+        }
+        with self._lock:
+            self._snapshot = snapshot
+        return snapshot
+
+    def maybe_checkpoint(self, snapshot, final=False):
+        if self.checkpoints is None:
+            return
+        steps = self.num_timesteps
+        if final or steps - self.last_checkpoint_step >= self.checkpoint_interval:
+            # Snapshots are never modified after publishing, the saver can share them
+            self.checkpoints.save_state(snapshot, self.step_offset + steps)
+            self.last_checkpoint_step = steps
+
+    def latest_snapshot(self):
+        """Return the newest policy weights once, or None if nothing new was published."""
+        with self._lock:
+            snapshot, self._snapshot = self._snapshot, None
+        return snapshot
@@ -0,0 +1 @@
+"""Repeatable performance scenarios; run with ``python -m benchmarks``."""
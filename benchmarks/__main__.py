@@ -0,0 +1,72 @@
+import argparse
+import json
+import platform
+import sys
+import time
+from benchmarks.runner import run_isolated
+from benchmarks.scenarios import SCENARIOS
+
+
+def compare(results, baseline, tolerance):
+    """Return the scenarios whose throughput dropped more than tolerance below baseline."""
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is None:
+            continue
+        ratio = result["samples_per_second"] / previous["samples_per_second"]
+        if ratio < 1 - tolerance:
+            regressions.append((name, ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Flappy Polygon benchmarks")
+    parser.add_argument(
+        "scenarios", nargs="*", default=list(SCENARIOS), help="Scenarios to run"
+    )
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", help="Earlier results file to compare against")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="Allowed throughput drop against the baseline",
+    )
+    args = parser.parse_args()
+
+    results = {}
+    for name in args.scenarios:
+        result = run_isolated(name)
+        results[name] = result
+        latency = result["latency_us"]
+        print(
+            f"{name:24s} {result['samples_per_second']:12.1f} samples/s  "
+            f"p50 {latency['p50']:9.1f}us  p99 {latency['p99']:9.1f}us  "
+            f"rss {result['peak_rss_mb'] or 0:.0f}MB"
+        )
+
+    with open(args.output, "w") as f:
+        json.dump(
+            {
+                "timestamp": time.time(),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "results": results,
+            },
+            f,
+            indent=2,
+        )
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for name, ratio in regressions:
+            print(f"REGRESSION {name}: {ratio:.0%} of baseline throughput")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import multiprocessing as mp
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from benchmarks.scenarios import SCENARIOS
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_scenario(name):
+    start = time.perf_counter()
+    latencies, samples_per_op = SCENARIOS[name]()
+    elapsed = time.perf_counter() - start
+    latencies_us = latencies / 1000
+    busy_seconds = latencies.sum() / 1e9
+    return {
+        "operations": len(latencies),
+        "samples_per_second": len(latencies) * samples_per_op / busy_seconds,
+        "latency_us": {
+            "mean": float(latencies_us.mean()),
+            "p50": float(np.percentile(latencies_us, 50)),
+            "p90": float(np.percentile(latencies_us, 90)),
+            "p99": float(np.percentile(latencies_us, 99)),
+            "max": float(latencies_us.max()),
+        },
+        "wall_seconds": elapsed,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def run_isolated(name):
+    """Run one scenario in a fresh process, so its peak RSS is its own."""
+    # spawn, so no scenario inherits memory or imports from an earlier one
+    context = mp.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        return pool.submit(run_scenario, name).result()
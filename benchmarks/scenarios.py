@@ -0,0 +1,163 @@
+import os
+import time
+import numpy as np
+
+# Every scenario returns per-operation latencies in nanoseconds and the number
+# of samples each operation produced (e.g. one step of 64 batched games is 64).
+
+
+def env_step(steps=20000, seed=0):
+    """Headless FlappyEnv stepping with random actions."""
+    from flappy_env import FlappyEnv
+    from simulation import Simulation
+
+    env = FlappyEnv(Simulation(seed=seed))
+    env.reset()
+    actions = np.random.default_rng(seed).integers(0, 2, size=steps)
+    latencies = np.empty(steps, dtype=np.int64)
+    for i in range(steps):
+        start = time.perf_counter_ns()
+        _, _, terminated, truncated, _ = env.step(int(actions[i]))
+        if terminated or truncated:
+            env.reset()
+        latencies[i] = time.perf_counter_ns() - start
+    return latencies, 1
+
+
+def pixel_env_step(steps=5000, seed=0):
+    """PixelFlappyEnv stepping, including off-screen rendering and frame stacking."""
+    from pixel_observation import PixelFlappyEnv
+
+    env = PixelFlappyEnv()
+    env.reset(seed=seed)
+    actions = np.random.default_rng(seed).integers(0, 2, size=steps)
+    latencies = np.empty(steps, dtype=np.int64)
+    for i in range(steps):
+        start = time.perf_counter_ns()
+        _, _, terminated, truncated, _ = env.step(int(actions[i]))
+        if terminated or truncated:
+            env.reset()
+        latencies[i] = time.perf_counter_ns() - start
+    return latencies, 1
+
+
+def vec_env_step(steps=2000, num_envs=64, seed=0, action_repeat=None):
+    """VecFlappyEnv stepping a batch of games with random actions."""
+    from vec_flappy_env import VecFlappyEnv
+
+    env = VecFlappyEnv(num_envs, seed=seed, action_repeat=action_repeat)
+    env.reset()
+    rng = np.random.default_rng(seed)
+    latencies = np.empty(steps, dtype=np.int64)
+    for i in range(steps):
+        actions = rng.integers(0, 2, size=num_envs)
+        start = time.perf_counter_ns()
+        env.step(actions)
+        latencies[i] = time.perf_counter_ns() - start
+    return latencies, num_envs
+
+
+def _create_game():
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    from game_loop import GameLoop
+
+    pygame.init()
+    screen = pygame.display.set_mode((400, 600))
+    return GameLoop(screen, pygame.time.Clock())
+
+
+def _fill_pipes(game, num_pipes):
+    from simulation import PipePair
+
+    spacing = game.width / max(num_pipes, 1)
+    for i in range(num_pipes):
+        game.sim.pipes.append(
+            PipePair(i * spacing, 150, game.sim.pipe_gap, game.sim.pipe_width)
+        )
+    return spacing
+
+
+def _advance_scene(game, frame, num_pipes, spacing):
+    """Scroll the pipes and bob the bird without letting the game end.
+
+    Pipes that leave the screen come back on the right, so every frame
+    repaints the same amount as real play.
+    """
+    from simulation import PipePair
+
+    sim = game.sim
+    pipes = sim.pipes
+    pipes.move(-sim.pipe_speed)
+    while len(pipes) < num_pipes:
+        last = pipes.last()
+        x = last.x + spacing if last is not None else game.width
+        pipes.append(PipePair(x, 150, sim.pipe_gap, sim.pipe_width))
+    bird = sim.bird
+    bird.prev_y = bird.y
+    bird.velocity = 6 * np.sin(frame / 15)
+    bird.y += bird.velocity
+    bird.angle = -bird.velocity * 3
+
+
+def render(frames=600, num_pipes=4, training=False):
+    """GameLoop.draw and present frame time with num_pipes on screen, in play or training mode."""
+    game = _create_game()
+    game.training_active = training
+    if training:
+        game.ensure_model()
+    spacing = _fill_pipes(game, num_pipes)
+    latencies = np.empty(frames, dtype=np.int64)
+    for i in range(frames):
+        if training:
+            game.train_and_update_game()
+        else:
+            _advance_scene(game, i, num_pipes, spacing)
+        game.sync_sprites(i % 10 / 10)
+        start = time.perf_counter_ns()
+        game.draw()
+        game.present()
+        latencies[i] = time.perf_counter_ns() - start
+    return latencies, 1
+
+
+def train(timesteps=8192, num_envs=8):
+    """PPO.learn on VecFlappyEnv; one operation is one rollout plus update."""
+    from stable_baselines3 import PPO
+    from stable_baselines3.common.callbacks import BaseCallback
+    from vec_flappy_env import VecFlappyEnv
+
+    n_steps = 256
+    rollout_times = []
+
+    class RolloutTimer(BaseCallback):
+        def _on_training_start(self):
+            self.last = time.perf_counter_ns()
+
+        def _on_rollout_start(self):
+            now = time.perf_counter_ns()
+            if self.num_timesteps:
+                rollout_times.append(now - self.last)
+            self.last = now
+
+        def _on_step(self):
+            return True
+
+        def _on_training_end(self):
+            rollout_times.append(time.perf_counter_ns() - self.last)
+
+    model = PPO("MlpPolicy", VecFlappyEnv(num_envs), verbose=0, n_steps=n_steps)
+    model.learn(total_timesteps=timesteps, callback=RolloutTimer())
+    return np.array(rollout_times, dtype=np.int64), n_steps * num_envs
+
+
+SCENARIOS = {
+    "env_step": env_step,
+    "pixel_env_step": pixel_env_step,
+    "vec_env_step": vec_env_step,
+    "vec_env_step_repeat": lambda: vec_env_step(steps=500, action_repeat=9),
+    "render_play": lambda: render(training=False),
+    "render_play_many_pipes": lambda: render(num_pipes=16, training=False),
+    "render_training": lambda: render(training=True),
+    "train": train,
+}
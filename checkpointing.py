@@ -0,0 +1,141 @@
+import glob
+import os
+import queue
+import re
+import threading
+from training_log import logger
+
+
+def checkpoint_step(path, prefix="ppo_flappy"):
+    """The step tag in a checkpoint file name, or None for other files."""
+    match = re.fullmatch(re.escape(prefix) + r"_(\d+)\.zip", os.path.basename(path))
+    return int(match.group(1)) if match else None
+
+
+def checkpoint_paths(directory, prefix="ppo_flappy"):
+    """Checkpoint files in directory, oldest step first."""
+    paths = []
+    for path in glob.glob(os.path.join(directory, f"{prefix}_*.zip")):
+        step = checkpoint_step(path, prefix)
+        if step is not None:
+            paths.append((step, path))
+    return [path for _, path in sorted(paths)]
+
+
+def latest_checkpoint(directory, prefix="ppo_flappy"):
+    paths = checkpoint_paths(directory, prefix)
+    return paths[-1] if paths else None
+
+
+def load_checkpoint(path):
+    """Read the policy state_dict and the step count of a saved PPO model."""
+    from stable_baselines3.common.save_util import load_from_zip_file
+
+    data, params, _ = load_from_zip_file(path, device="cpu")
+    return params["policy"], (data or {}).get("num_timesteps", 0)
+
+
+class CheckpointSaver:
+    """Writes step-tagged PPO checkpoints from a background thread.
+
+    save() only copies the policy weights. The thread loads them into a model
+    of its own, made by model_factory, and saves that, so the caller's model is
+    never read while the file is written, and callers need no model of their
+    own. Only the newest keep_last files are kept. With export_path, the weights are also
+    exported as a NumpyPolicy.
+    """
+
+    def __init__(
+        self,
+        model_factory,
+        directory="checkpoints",
+        prefix="ppo_flappy",
+        keep_last=5,
+        export_path=None,
+    ):
+        self.model_factory = model_factory
+        self.directory = directory
+        self.prefix = prefix
+        self.keep_last = keep_last
+        self.export_path = export_path
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def save(self, policy, step):
+        state = policy.state_dict()
+        self.save_state({key: value.detach().clone() for key, value in state.items()}, step)
+
+    def save_state(self, state, step):
+        """Queue weights that the caller will not modify, e.g. a trainer snapshot."""
+        self._queue.put((state, step))
+
+    def _run(self):
+        model = None
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            state, step = item
+            try:
+                if model is None:
+                    model = self.model_factory()
+                self._write(model, state, step)
+            except Exception:
+                logger.exception("Saving the step %d checkpoint failed", step)
+
+    def _write(self, model, state, step):
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{self.prefix}_{step:010d}.zip")
+        model.policy.load_state_dict(state)
+        model.num_timesteps = step
+        # Write next to the target and rename, so readers never see a partial file
+        temporary_path = path[: -len(".zip")] + ".tmp.zip"
+        model.save(temporary_path)
+        os.replace(temporary_path, path)
+        if self.export_path is not None:
+            from numpy_policy import NumpyPolicy
+
+            temporary_path = self.export_path + ".tmp.npz"
+            NumpyPolicy.from_state_dict(state).save(temporary_path)
+            os.replace(temporary_path, self.export_path)
+        logger.info("Saved checkpoint %s", path)
+
+        for old_path in checkpoint_paths(self.directory, self.prefix)[: -self.keep_last]:
+            os.remove(old_path)
+
+    def close(self):
+        """Finish the queued saves and stop the thread."""
+        self._queue.put(None)
+        self._thread.join()
+
+
+class CheckpointLoader:
+    """Reads checkpoint weights in a background thread.
+
+    The game polls latest_loaded() between frames and swaps the weights in
+    there, so the policy never changes halfway through a frame.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded = None
+
+    def load(self, path):
+        threading.Thread(target=self._run, args=(path,), daemon=True).start()
+
+    def _run(self, path):
+        try:
+            loaded = load_checkpoint(path)
+        except Exception:
+            logger.exception("Loading checkpoint %s failed", path)
+            return
+        with self._lock:
+            self._loaded = loaded
+        logger.info("Loaded checkpoint %s at step %d", path, loaded[1])
+
+    def latest_loaded(self):
+        """Return (weights, step) of a newly loaded checkpoint once, or None."""
+        with self._lock:
+            loaded, self._loaded = self._loaded, None
+        return loaded
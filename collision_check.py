@@ -0,0 +1,84 @@
+import argparse
+import glob
+import random
+import sys
+from replay import SETTINGS, Replay
+from simulation import Simulation
+
+
+def record_episode(seed, max_ticks=3000):
+    """Play one episode with a noisy gap-seeking policy.
+
+    Returns (settings, episode seed, jump actions) like a recorded replay.
+    """
+    policy_rng = random.Random(seed)
+    sim = Simulation(seed=seed, collision_mode="rect")
+    actions = []
+    while sim.game_active and sim.tick < max_ticks:
+        next_pipe = sim.next_pipe()
+        target = (next_pipe.gap_top + next_pipe.gap_bottom) / 2 if next_pipe else sim.height / 2
+        jump = sim.bird.y > target + policy_rng.uniform(-60, 60) and sim.can_jump()
+        actions.append(jump)
+        sim.step(jump)
+    settings = {name: getattr(sim, name) for name in SETTINGS}
+    return settings, sim.episode_seed, actions
+
+
+def load_episode(path):
+    replay = Replay(path)
+    return replay.settings, replay.seed, [bool(jump) for jump in replay.jumps]
+
+
+def replay_episode(settings, seed, actions, collision_mode):
+    """Replay recorded actions and return (ticks survived, score, died)."""
+    sim = Simulation(**{**settings, "collision_mode": collision_mode})
+    sim.reset(seed)
+    for jump in actions:
+        sim.step(jump)
+        if not sim.game_active:
+            break
+    return sim.tick, sim.score, not sim.game_active
+
+
+def compare_collision_modes(episodes):
+    """Replay (name, settings, seed, actions) episodes in both collision modes and collect mismatches."""
+    mismatches = []
+    for name, settings, seed, actions in episodes:
+        rect_result = replay_episode(settings, seed, actions, "rect")
+        gap_result = replay_episode(settings, seed, actions, "gap")
+        if rect_result != gap_result:
+            mismatches.append((name, rect_result, gap_result))
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check that gap collisions match rect collisions on recorded episodes"
+    )
+    parser.add_argument(
+        "replays",
+        nargs="*",
+        help="Replay files or glob patterns; synthetic episodes are played if omitted",
+    )
+    parser.add_argument("--episodes", type=int, default=200, help="Synthetic episodes")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.replays:
+        paths = [path for pattern in args.replays for path in sorted(glob.glob(pattern))]
+        episodes = [(path, *load_episode(path)) for path in paths]
+    else:
+        episodes = [
+            (f"seed {seed}", *record_episode(seed))
+            for seed in range(args.seed, args.seed + args.episodes)
+        ]
+    mismatches = compare_collision_modes(episodes)
+    print(f"{len(episodes) - len(mismatches)}/{len(episodes)} episodes match")
+    for name, rect_result, gap_result in mismatches:
+        print(f"{name}: rect (ticks, score, died)={rect_result} gap={gap_result}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
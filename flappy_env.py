@@ -1,52 +1,149 @@
-import gym
-from gym import spaces
+import gymnasium as gym
+from gymnasium import spaces
 import numpy as np
-import pygame
+from simulation import TICK_RATE, Simulation, ms_to_ticks
+from training_log import logger
+
+BACKGROUND_COLOR = (135, 206, 235)
+PIPE_COLOR = (34, 139, 34)
+DECISION_INTERVAL = round(ms_to_ticks(150))  # Ticks between applied actions
 
 
 class FlappyEnv(gym.Env):
-    def __init__(self, game):
-        super(FlappyEnv, self).__init__()
-        self.game = game
-        self.action_space = spaces.Discrete(2)  # 0 for no action, 1 for jump
-        # Define observation space with detailed, descriptive inputs
-        self.observation_space = spaces.Box(
-            low=0, high=1, shape=(11,), dtype=np.float32
-        )
+    """Gymnasium environment around a headless Simulation.
 
-    def reset(self):
-        print("Environment reset")  # Debug statement
-        self.game.reset_game()
-        return self._get_observation()
+    Without a sim, one is created from sim_kwargs, which is how
+    gym.make("FlappyPolygon-v0", pipe_gap=200) builds it.
 
-    def step(self, action, current_time):
+    By default every step advances one tick and actions are only applied every
+    DECISION_INTERVAL ticks. With action_repeat=K every step applies the action
+    and then advances exactly K ticks, returning the summed reward.
+    """
 
-        print("Action taken:", action)  # Debug statement
-        # Only take the action every 150 milliseconds
-        if (
-            current_time - self.game.last_training_time >= 150
-        ):  # 0.1 second = 100 milliseconds
-            if action == 1 and self.game.bird.can_jump():
-                self.game.bird.jump()
-            else:
-                self.game.bird.no_jump()
+    metadata = {"render_modes": ["rgb_array"], "render_fps": TICK_RATE}
 
-            # Each Step
-            self.game.last_training_time = current_time
-            self.game.current_steps += 1
+    def __init__(
+        self, sim=None, render_mode=None, step_log=None, action_repeat=None, **sim_kwargs
+    ):
+        super(FlappyEnv, self).__init__()
+        if render_mode is not None and render_mode not in self.metadata["render_modes"]:
+            raise ValueError(f"Unsupported render mode: {render_mode}")
+        self.sim = sim if sim is not None else Simulation(**sim_kwargs)
+        self.render_mode = render_mode
+        self.step_log = step_log  # Optional StepLogger, None keeps step() free of logging
+        self.current_steps = 0
+        self.action_repeat = action_repeat
+        self.decision_interval = DECISION_INTERVAL
+        self.last_decision_tick = -self.decision_interval
+        self._logged_action = 0  # Decision and reward of the interval being logged
+        self._logged_reward = 0
+        self.action_space = spaces.Discrete(2)  # 0 for no action, 1 for jump
+        # Define observation space with detailed, descriptive inputs.
+        # Most features lie in [0, 1], but velocity and gap offset are signed and
+        # positions leave that range as the bird crosses the screen edge.
+        self.observation_space = spaces.Box(
+            low=-np.inf, high=np.inf, shape=(11,), dtype=np.float32
+        )
+        self._obs = np.zeros(11, dtype=np.float32)
+        self._canvas = None  # Off-screen surface for render(), created on first use
+        self._observe()
+
+    def reset(self, seed=None, options=None):
+        super().reset(seed=seed)
+        logger.debug("Environment reset")
+        if seed is not None:
+            # Later unseeded resets continue from this seed's episode sequence
+            self.sim.seed_rng.seed(seed)
+        self.sim.reset()
+        self.last_decision_tick = -self.decision_interval
+        self._logged_reward = 0
+        # The buffer is reused by every step, callers get their own copy
+        return self._observe().copy(), {}
+
+    def step(self, action):
+        if self.action_repeat is not None:
+            return self._step_repeated(action)
+
+        # Only take the action every decision interval
+        jump = False
+        if self.decision_due():
+            jump = action == 1 and self.sim.can_jump()
+            self.last_decision_tick = self.sim.tick
+            self.current_steps += 1
+            self._logged_action = action
 
         # Update game state
-        self.game.update_game(pygame.time.get_ticks())
+        self.sim.step(jump)
 
-        done = not self.game.game_active
+        terminated = not self.sim.game_active
+        obs = self._observe().copy()
         reward = self._calculate_reward()
-
-        return self._get_observation(), reward, done, {}
+        if self.step_log is not None:
+            # One record per decision, like an action_repeat step, so the ignored
+            # actions of the ticks in between are not counted
+            self._logged_reward += reward
+            if terminated or self.decision_due():
+                self.step_log.record(self._logged_action, self._logged_reward, terminated)
+                self._logged_reward = 0
+
+        return obs, reward, terminated, False, {}
+
+    def decision_due(self):
+        """Return True if step() applies its action on the current tick."""
+        return self.sim.tick - self.last_decision_tick >= self.decision_interval
+
+    def _step_repeated(self, action):
+        jump = action == 1 and self.sim.can_jump()
+        self.current_steps += 1
+        reward = 0
+        for _ in range(self.action_repeat):
+            self.sim.step(jump)
+            jump = False  # A jump is an impulse, the remaining ticks only coast
+            self._observe()
+            reward += self._calculate_reward()
+            if not self.sim.game_active:
+                break
+
+        terminated = not self.sim.game_active
+        obs = self._obs.copy()
+        if self.step_log is not None:
+            self.step_log.record(action, reward, terminated)
+
+        return obs, reward, terminated, False, {}
+
+    def render(self):
+        if self.render_mode != "rgb_array":
+            return None
+        import pygame
+
+        return pygame.surfarray.array3d(self._draw_frame()).transpose(1, 0, 2)
+
+    def _draw_frame(self):
+        import pygame
+
+        if self._canvas is None:
+            from player_bird import PlayerBird
+
+            # 24-bit fills are the cheapest and surfarray views still work on them
+            self._canvas = pygame.Surface((self.sim.width, self.sim.height), 0, 24)
+            self._bird_sprite = PlayerBird(self.sim.bird.x, self.sim.bird.y)
+        canvas = self._canvas
+        canvas.fill(BACKGROUND_COLOR)
+        height = self.sim.height
+        for pipe in self.sim.pipes:
+            x = round(pipe.x)
+            canvas.fill(PIPE_COLOR, (x, 0, pipe.width, pipe.gap_top))
+            canvas.fill(
+                PIPE_COLOR, (x, pipe.gap_bottom, pipe.width, height - pipe.gap_bottom)
+            )
+        self._bird_sprite.update(self.sim.bird)
+        canvas.blit(self._bird_sprite.image, self._bird_sprite.rect)
+        return canvas
 
     def _calculate_reward(self):
         reward = 0
 
-        if self.game.pipes:
+        if self.sim.pipes:
             reward += self._reward_for_clearing_pipes()
             reward += self._penalty_for_hitting_obstacles()
             reward += self._pentalty_for_being_near_top_or_bottom()
@@ -63,172 +160,95 @@ class FlappyEnv(gym.Env):
 
     def _reward_for_clearing_pipes(self):
         reward = 0
-        for pipe in self.game.pipes:
-            if pipe.scored and not pipe.trained:
+        # Scored pipes form the front of the queue
+        for pipe in self.sim.pipes:
+            if not pipe.scored:
+                break
+            if not pipe.trained:
                 reward += 5  # Extra reward for clearing pipes
                 pipe.trained = True
         return reward
 
     def _reward_for_staying_in_middle_when_no_pipes(self):
         if (
-            not self.game.pipes
-            and abs(self.game.bird.rect.centery - self.game.height / 2)
-            < 0.15 * self.game.height
+            not self.sim.pipes
+            and abs(self.sim.bird.y - self.sim.height / 2)
+            < 0.15 * self.sim.height
         ):
             return 0.1
         return 0
 
     def _penalty_for_hitting_obstacles(self):
         reward = 0
-        if pygame.sprite.spritecollideany(self.game.bird, self.game.pipes):
+        if self.sim.hit_pipe:
             reward -= 10
-            self.game.game_active = False
+            self.sim.game_active = False
         if (
-            self.game.bird.rect.top <= 0
-            or self.game.bird.rect.bottom >= self.game.height
+            self.sim.bird.top <= 0
+            or self.sim.bird.bottom >= self.sim.height
         ):
             reward -= 15
-            self.game.game_active = False
+            self.sim.game_active = False
         return reward
 
     def _pentalty_for_being_near_top_or_bottom(self):
-        distance_from_border_where_penalty_starts = 0.2 * self.game.height
+        distance_from_border_where_penalty_starts = 0.2 * self.sim.height
         penalty_scale_factor = 0.1
 
-        if self.game.bird.rect.top < distance_from_border_where_penalty_starts:
-            distance_to_top = distance_from_border_where_penalty_starts - self.game.bird.rect.top
+        if self.sim.bird.top < distance_from_border_where_penalty_starts:
+            distance_to_top = distance_from_border_where_penalty_starts - self.sim.bird.top
             penalty = -penalty_scale_factor * np.exp(distance_to_top / distance_from_border_where_penalty_starts)
             return penalty
 
-        if self.game.bird.rect.bottom > self.game.height - distance_from_border_where_penalty_starts:
-            distance_to_bottom = self.game.bird.rect.bottom - (self.game.height - distance_from_border_where_penalty_starts)
+        if self.sim.bird.bottom > self.sim.height - distance_from_border_where_penalty_starts:
+            distance_to_bottom = self.sim.bird.bottom - (self.sim.height - distance_from_border_where_penalty_starts)
             penalty = -penalty_scale_factor * np.exp(distance_to_bottom / distance_from_border_where_penalty_starts)
             return penalty
 
         return 0
 
     def _reward_for_being_in_gap(self):
-        if self._is_in_gap():
+        if self.in_gap:
             return 1
         return 0
 
     def _get_observation(self):
-        bird_y_ratio = self._get_bird_y_ratio()
-        bird_velocity = self._get_bird_velocity()
-        bird_angle_normalized = self._get_bird_angle_normalized()
-        distance_from_top = self._get_distance_to_top()
-        distance_from_bottom = self._get_distance_to_bottom()
-        pipe_distance_ratio, gap_top_y, gap_bottom_y = self._get_pipe_info()
-        time_until_jump_cooldown_over = self._get_time_until_jump_cooldown_over()
-        is_in_gap = 1 if self._is_in_gap() else 0
-
-        gap_center_y, bird_y_distance_from_gap_center_y = (
-            self._get_gap_center_and_distance(self._get_closest_pipe())
-        )
-
-        return np.array(
-            [
-                bird_y_ratio,
-                bird_velocity,
-                bird_angle_normalized,
-                distance_from_top,
-                distance_from_bottom,
-                pipe_distance_ratio,
-                gap_top_y,
-                gap_bottom_y,
-                time_until_jump_cooldown_over,
-                bird_y_distance_from_gap_center_y,
-                is_in_gap,
-            ],
-            dtype=np.float32,
-        )
-
-    def _get_bird_y_ratio(self):
-        return self.game.bird.rect.y / self.game.height
-
-    def _get_bird_velocity(self):
-        return self.game.bird.velocity / 10
-
-    def _get_bird_angle_normalized(self):
-        return (self.game.bird.angle + 90) / 180
-
-    def _get_closest_pipe(self):
-        return min(
-            (
-                pipe
-                for pipe in self.game.pipes
-                if pipe.rect.right > self.game.bird.rect.left
-            ),
-            key=lambda p: p.rect.right,
-            default=None,
-        )
-
-    def _get_gap_center_and_distance(self, closest_pipe):
-        # if no pipe, return middle of screen
-        if closest_pipe is None:
-            center = 0.5
-            # calculate distance from mock gap center
-            return center, self.game.bird.rect.centery / self.game.height - center
-
-        gap_top_y = (
-            closest_pipe.rect.bottom if closest_pipe.is_top else closest_pipe.rect.y
-        ) / self.game.height
-        gap_bottom_y = gap_top_y + self.game.pipe_gap / self.game.height
-        gap_center_y = (gap_top_y + gap_bottom_y) / 2
-
-        bird_y_distance_from_gap_center_y = (
-            self.game.bird.rect.centery / self.game.height - gap_center_y
-        )
-        return gap_center_y, bird_y_distance_from_gap_center_y
-
-    def _get_pipe_info(self):
-        if self.game.pipes:
-            next_pipe = min(
-                self.game.pipes,
-                key=lambda p: (
-                    p.rect.right
-                    if p.rect.right > self.game.bird.rect.left
-                    else float("inf")
-                ),
-            )
-            pipe_distance_ratio = (
-                next_pipe.rect.x - self.game.bird.rect.x
-            ) / self.game.width
-
-            gap_top_y = (
-                (next_pipe.rect.bottom / self.game.height)
-                if next_pipe.is_top
-                else (next_pipe.rect.y / self.game.height)
-            )
-            gap_bottom_y = gap_top_y + (self.game.pipe_gap / self.game.height)
-        else:
+        """Return the observation buffer, which is overwritten on the next step or reset."""
+        return self._obs
+
+    def _observe(self):
+        # Look up the next pipe once per tick and fill every feature from it
+        bird = self.sim.bird
+        height = self.sim.height
+        next_pipe = self.sim.next_pipe()
+        if next_pipe is None:
             pipe_distance_ratio = 1.0  # Default to far right if no pipe exists
             gap_top_y = 0.3  # Default center if no pipe
             gap_bottom_y = 0.7  # Default center if no pipe
-
-        return pipe_distance_ratio, gap_top_y, gap_bottom_y
-
-    def _get_time_until_jump_cooldown_over(self):
-        return (
-            max(
-                0,
-                self.game.bird.jump_cooldown
-                - (pygame.time.get_ticks() - self.game.bird.last_jump_time),
-            )
-            / 1000
-        )
-
-    def _get_distance_to_top(self):
-        return self.game.bird.rect.top / self.game.height
-
-    def _get_distance_to_bottom(self):
-        return (self.game.height - self.game.bird.rect.bottom) / self.game.height
-
-    def _is_in_gap(self) -> bool:
-        bird_y = self.game.bird.rect.centery
-        # if bird_y is less than   greater than gap top Y and less than gap bottom Y, return True else False
-        pipe_distance_ratio, gap_top_y, gap_bottom_y = self._get_pipe_info()
-        
-        if bird_y > gap_top_y * self.game.height and bird_y < gap_bottom_y * self.game.height:
-            return True 
-        return False
\ No newline at end of file
+            gap_center_y = 0.5
+        else:
+            pipe_distance_ratio = (next_pipe.x - bird.left) / self.sim.width
+            gap_top_y = next_pipe.gap_top / height
+            gap_bottom_y = gap_top_y + self.sim.pipe_gap / height
+            gap_center_y = (gap_top_y + gap_bottom_y) / 2
+        self.in_gap = gap_top_y * height < bird.y < gap_bottom_y * height
+
+        obs = self._obs
+        obs[0] = bird.top / height  # Bird Y position
+        obs[1] = bird.velocity / 10
+        obs[2] = (bird.angle + 90) / 180
+        obs[3] = bird.top / height  # Distance from top
+        obs[4] = (height - bird.bottom) / height  # Distance from bottom
+        obs[5] = pipe_distance_ratio
+        obs[6] = gap_top_y
+        obs[7] = gap_bottom_y
+        obs[8] = self.sim.ticks_until_jump() / TICK_RATE
+        obs[9] = bird.y / height - gap_center_y
+        obs[10] = self.in_gap
+        return obs
+
+
+gym.register(id="FlappyPolygon-v0", entry_point="flappy_env:FlappyEnv")
+gym.register(
+    id="FlappyPolygonPixels-v0", entry_point="pixel_observation:PixelFlappyEnv"
+)
@@ -1,47 +1,86 @@
+import os
 import sys
+import time
+from collections import deque
 import pygame
-import random
 from player_bird import PlayerBird
 from pipe import Pipe
 from text_object import TextObject
 from settings_menu import SettingsMenu
-from stable_baselines3 import PPO
 from flappy_env import FlappyEnv
+from numpy_policy import NumpyPolicy
 from training_ui import TrainingUI
-import random
+from text_cache import TextCache
+from training_log import StepLogger, logger
+from profiler import FrameProfiler, ProfilerOverlay
+from replay import SETTINGS, ReplayRecorder
+from checkpointing import (
+    CheckpointLoader,
+    CheckpointSaver,
+    checkpoint_step,
+    latest_checkpoint,
+)
+from simulation import TICK_RATE, Simulation
 
 
 class GameLoop:
-    def __init__(self, screen, clock):
+    def __init__(self, screen, clock, collision_mode="rect", training_workers=0):
         self.screen = screen
         self.clock = clock
         self.width, self.height = self.screen.get_size()
         self.running = True
-        self.game_active = True
         self.all_sprites = pygame.sprite.Group()
-        self.pipes = pygame.sprite.Group()
-        self.gravity = 0.5
+        self.pipe_sprites = deque()  # (PipePair, top sprite, bottom sprite)
         self.default_jump_strength = -7.8
         self.default_pipe_speed = 2.4
 
-        # Initialize pipe_speed and pipe_interval
-        self.pipe_speed = self.default_pipe_speed
-        self.base_pipe_interval = 2000
-        self.pipe_interval = self.calculate_pipe_interval()
+        # The simulation owns all game state; this class only renders it
+        # Fixed-timestep state: real time is accumulated and spent in whole ticks
+        self.tick_duration = 1000 / TICK_RATE  # milliseconds
+        self.max_frame_time = 250  # Drop time beyond this after a stall
+        self.accumulator = 0
+        self.speed_multiplier = 1  # Ticks per tick duration, for fast-forward
+        self.fast_forward_speeds = (1, 2, 4, 8)
+        self.sim = Simulation(
+            self.width,
+            self.height,
+            jump_strength=self.default_jump_strength,
+            pipe_speed=self.default_pipe_speed,
+            collision_mode=collision_mode,
+        )
+
+        # Dirty-rect rendering: only regions touched by changed sprites are repainted
+        self.dirty_rendering = True
+        self.full_redraw = True
+        self.background = pygame.Surface((self.width, self.height))
+        self.background.fill((135, 206, 235))
+        self.render_group = pygame.sprite.LayeredDirty()
+        self.render_group.clear(self.screen, self.background)
+        self.update_rects = None  # Screen regions draw() changed, None for all of it
 
-        # Pipe gap
-        self.pipe_gap = 250
+        self.pending_jump = False  # Space presses are applied on the next tick
 
-        self.bird = PlayerBird(50, self.height // 2, self.default_jump_strength)
+        # Replays: recording is toggled with 'R', playback via play_replay()
+        self.record_replays = False
+        self.replay_dir = "replays"
+        self.replay_jumps = None  # Iterator over recorded jumps while playing back
+
+        self.bird = PlayerBird(self.sim.bird.x, self.sim.bird.y)
         self.all_sprites.add(self.bird)
-        self.last_pipe = pygame.time.get_ticks()
+        self.render_group.add(self.bird, layer=1)
         self.font = pygame.font.SysFont(None, 48)
+        self.text_cache = TextCache(self.font)
         self.game_over_text = TextObject(
             "Game Over", self.font, self.width // 2, self.height // 2, center=True
         )
         self.score = 0
         self.score_text = TextObject(
-            f"Score: {self.score}", self.font, 10, 10, center=False
+            f"Score: {self.score}",
+            self.font,
+            10,
+            10,
+            center=False,
+            text_cache=self.text_cache,
         )
 
         # Instructions text
@@ -52,91 +91,259 @@ class GameLoop:
             self.height - 30,
             center=True,
         )
+        self.render_group.add(self.score_text, self.instructions_text, layer=2)
         self.training_steps = 10000
-        self.current_steps = 0
         self.learning_rate = 0.001
-        self.last_training_time = 0
+        self.training_workers = training_workers  # >0 collects rollouts in processes
 
-        # Initialize PPO Model
-        self.env = FlappyEnv(self)
-        self.model = PPO(
-            "MlpPolicy", self.env, verbose=1, learning_rate=self.learning_rate
+        self.env = FlappyEnv(
+            self.sim, step_log=StepLogger("training game", summary_interval=600)
         )
+        # The PPO model pulls in torch, so it is only created once it is needed
+        self.model = None
+        # NumPy copy of the actor for per-tick actions, rebuilt when weights change.
+        # An exported policy lets 'A' autoplay without loading torch at all.
+        self.policy_path = "ppo_flappy.npz"
+        self.policy = None
+        if os.path.exists(self.policy_path):
+            self.policy = NumpyPolicy.load(self.policy_path)
+        self.autoplay = False
+        self.policy_action = 0  # Held between the env's decision ticks
+
+        # Checkpoints are written and read in background threads; 'K' saves,
+        # 'L' loads the newest and the weights are swapped in between frames.
+        # Neither needs the PPO model, the saver thread builds one of its own.
+        self.checkpoint_dir = "checkpoints"
+        self.checkpoints = CheckpointSaver(
+            self.create_checkpoint_model,
+            self.checkpoint_dir,
+            export_path=self.policy_path,
+        )
+        self.checkpoint_loader = CheckpointLoader()
+        self.loaded_weights = None  # Loaded before the model, applied when it is built
+        # Steps of trainers that already stopped. Tags continue after the newest
+        # checkpoint, so a new session never overwrites an older one's files.
+        latest = latest_checkpoint(self.checkpoint_dir)
+        self.completed_training_steps = checkpoint_step(latest) if latest else 0
 
         # Settings menu and Training UI
         self.settings_menu = SettingsMenu(
             self.width,
             self.height,
-            abs(self.bird.jump_strength),
-            abs(self.pipe_speed),
+            abs(self.sim.jump_strength),
+            abs(self.sim.pipe_speed),
             self.training_steps,
             self.learning_rate,
             training_mode=False,
         )
         self.settings_active = False
         self.training_active = False
+        self.trainer = None
+        self.stopping_trainers = []  # Finishing their last update, joined on exit
         self.training_ui = TrainingUI(self.width, self.height)
 
-    def calculate_pipe_interval(self):
-        base_speed = 3
-        interval = self.base_pipe_interval * (base_speed / self.pipe_speed)
-        return interval
+        # Phase timings, shown with 'P' and written to profile_path with 'O'
+        self.profiler = FrameProfiler()
+        self.profiler_overlay = ProfilerOverlay(self.profiler, self.width - 5, 5)
+        self.render_group.add(self.profiler_overlay, layer=3)
+        self.profile_path = "frame_profile.json"
+
+    @property
+    def game_active(self):
+        return self.sim.game_active
+
+    def ensure_model(self):
+        if self.model is None:
+            from stable_baselines3 import PPO
+
+            self.model = PPO(
+                "MlpPolicy", self.env, verbose=1, learning_rate=self.learning_rate
+            )
+            if self.loaded_weights is not None:
+                self.model.policy.load_state_dict(self.loaded_weights)
+                self.loaded_weights = None
+            self.policy = NumpyPolicy.from_sb3(self.model.policy)
+        return self.model
+
+    def create_checkpoint_model(self):
+        # The saver thread's own model, so saving never reads self.model
+        from stable_baselines3 import PPO
+
+        env = FlappyEnv(Simulation(self.width, self.height))
+        return PPO("MlpPolicy", env, learning_rate=self.learning_rate, device="cpu")
+
+    @property
+    def trained_steps(self):
+        running = self.trainer.num_timesteps if self.trainer else 0
+        return self.completed_training_steps + running
+
+    def apply_loaded_weights(self):
+        loaded = self.checkpoint_loader.latest_loaded()
+        if loaded is None:
+            return
+        weights, step = loaded
+        # Continue counting from the checkpoint's steps
+        running = self.trainer.num_timesteps if self.trainer else 0
+        self.completed_training_steps = step - running
+        if self.model is None:
+            # Building the model here would stall the frame, ensure_model() applies them
+            self.loaded_weights = weights
+        else:
+            self.model.policy.load_state_dict(weights)
+        self.policy = NumpyPolicy.from_state_dict(weights)
+        if self.trainer is not None:
+            # The learner continues from them, restarting it would block the frame
+            self.trainer.load_weights(weights, self.completed_training_steps)
+
+    def start_training(self):
+        from background_trainer import BackgroundTrainer
+
+        self.ensure_model()
+        self.trainer = BackgroundTrainer(
+            self.learning_rate,
+            self.training_steps,
+            initial_policy=self.model.policy,
+            num_workers=self.training_workers,
+            checkpoints=self.checkpoints,
+            step_offset=self.completed_training_steps,
+            game_settings={name: getattr(self.sim, name) for name in SETTINGS},
+        )
+        self.trainer.start()
+
+    def stop_training(self):
+        if self.trainer is not None:
+            # Joining here would freeze the frame until the learner's update ends
+            self.trainer.stop(wait=False)
+            self.completed_training_steps += self.trainer.num_timesteps
+            self.stopping_trainers = [
+                trainer for trainer in self.stopping_trainers if trainer.is_running()
+            ]
+            self.stopping_trainers.append(self.trainer)
+            self.trainer = None
 
     def reset_game(self):
-        self.game_active = True
-        self.all_sprites.empty()
-        self.pipes.empty()
-        self.bird = PlayerBird(50, self.height // 2, self.bird.jump_strength)
-        self.all_sprites.add(self.bird)
-        self.last_pipe = pygame.time.get_ticks()
-        self.score = 0
-        self.score_text.update_text(f"Score: {self.score}")
-
-        # if self.training_active:
-            # self.generate_initial_pipes()
-
-    # def generate_initial_pipes(self):
-    #     # Populate screen with initial pipes spaced farther apart
-    #     num_initial_pipes = 3
-    #     pipe_spacing = self.width // (
-    #         num_initial_pipes - 1
-    #     )  # Space out more than screen width
-
-    #     for i in range(num_initial_pipes):
-    #         pipe_x = self.width + i * pipe_spacing
-    #         pipe_height = random.randint(50, self.height - self.pipe_gap - 50)
-    #         pipe_width = 60
-
-    #         top_pipe = Pipe(
-    #             pipe_x, 0, pipe_width, pipe_height, self.pipe_speed, is_top=True
-    #         )
-    #         bottom_pipe = Pipe(
-    #             pipe_x,
-    #             pipe_height + self.pipe_gap,
-    #             pipe_width,
-    #             self.height - pipe_height - self.pipe_gap,
-    #             self.pipe_speed,
-    #             is_top=False,
-    #         )
-
-    #         self.pipes.add(top_pipe, bottom_pipe)
-    #         self.all_sprites.add(top_pipe, bottom_pipe)
-
-    #     # Delay next pipe spawn to avoid overlap
-    #     self.last_pipe = pygame.time.get_ticks() + self.pipe_interval
+        self.env.reset()  # Resets the sim and the env's decision gate with it
+        self.start_recording()
+        self.sync_sprites()
+
+    def start_recording(self):
+        # Called right after a reset so the replay starts at the episode's first tick
+        self.stop_recording()
+        if not self.record_replays or self.replay_jumps is not None:
+            return
+        os.makedirs(self.replay_dir, exist_ok=True)
+        path = os.path.join(
+            self.replay_dir, f"episode_{int(time.time() * 1000)}_{self.sim.episode_seed}.fpr"
+        )
+        # Policy play also stores observations for offline datasets
+        self.sim.recorder = ReplayRecorder(
+            path, self.sim, record_observations=self.training_active
+        )
+
+    def stop_recording(self):
+        recorder = self.sim.recorder
+        if recorder is not None:
+            recorder.close()
+            self.sim.recorder = None
+            logger.info("Saved %d-tick replay to %s", recorder.ticks, recorder.path)
+
+    def play_replay(self, replay):
+        """Show a recorded episode instead of taking input."""
+        self.stop_recording()
+        for name, value in replay.settings.items():
+            setattr(self.sim, name, value)
+        self.sim.reset(replay.seed)
+        self.replay_jumps = iter(replay.jumps.tolist())
+        self.sync_sprites()
+
+    def sync_sprites(self, alpha=1.0):
+        # Sprites follow the pipe queue's order: removals at the front, spawns at the back
+        first_pair = self.sim.pipes.first()
+        while self.pipe_sprites and self.pipe_sprites[0][0] is not first_pair:
+            _, top_pipe, bottom_pipe = self.pipe_sprites.popleft()
+            top_pipe.kill()
+            bottom_pipe.kill()
+        for index in range(len(self.pipe_sprites), len(self.sim.pipes)):
+            pair = self.sim.pipes[index]
+            top_pipe = Pipe(
+                pair.x,
+                0,
+                pair.width,
+                pair.gap_top,
+                is_top=True,
+                column_height=self.height,
+            )
+            bottom_pipe = Pipe(
+                pair.x,
+                pair.gap_bottom,
+                pair.width,
+                self.height - pair.gap_bottom,
+                is_top=False,
+                column_height=self.height,
+            )
+            self.pipe_sprites.append((pair, top_pipe, bottom_pipe))
+            self.all_sprites.add(top_pipe, bottom_pipe)
+            self.render_group.add(top_pipe, bottom_pipe, layer=0)
+
+        # Render between the previous and current tick to hide the tick/frame mismatch
+        for pair, top_pipe, bottom_pipe in self.pipe_sprites:
+            x = pair.prev_x + (pair.x - pair.prev_x) * alpha
+            top_pipe.update(x)
+            bottom_pipe.update(x)
+        self.bird.update(self.sim.bird, alpha)
+
+        if self.score != self.sim.score:
+            self.score = self.sim.score
+            self.score_text.update_text(f"Score: {self.score}")
 
     def run(self):
+        profiler = self.profiler
         while self.running:
+            start = profiler.start()
             dt = self.clock.tick(60)
-            current_time = pygame.time.get_ticks()
+            profiler.stop("wait", start)
+            start = profiler.start()
             self.handle_events()
+            self.apply_loaded_weights()
+            profiler.stop("events", start)
 
-            if self.training_active:
-                self.train_and_update_game(current_time)
-            elif self.game_active and not self.settings_active:
-                self.update_game(current_time)
-
+            simulating = self.training_active or (
+                self.game_active and not self.settings_active
+            )
+            if simulating:
+                self.accumulator += min(dt, self.max_frame_time) * self.speed_multiplier
+            else:
+                self.accumulator = 0
+
+            start = profiler.start()
+            while self.accumulator >= self.tick_duration:
+                self.accumulator -= self.tick_duration
+                if self.training_active:
+                    self.train_and_update_game()
+                elif self.game_active:
+                    self.update_game()
+                else:
+                    # Game over mid-frame, drop the leftover time
+                    self.accumulator = 0
+            profiler.stop("simulate", start)
+
+            start = profiler.start()
+            self.sync_sprites(self.accumulator / self.tick_duration)
+            self.profiler_overlay.update()
+            profiler.stop("sync", start)
+
+            start = profiler.start()
             self.draw()
+            profiler.stop("draw", start)
+            start = profiler.start()
+            self.present()
+            profiler.stop("flip", start)
+            profiler.end_frame()
+        self.stop_training()
+        for trainer in self.stopping_trainers:
+            trainer.join()  # Their final checkpoints must be queued before close()
+        self.checkpoints.close()
+        self.stop_recording()
         pygame.quit()
         sys.exit()
 
@@ -157,97 +364,122 @@ class GameLoop:
                         learning_rate,
                     ) = self.settings_menu.get_values()
 
+                    # Replays cannot follow a mid-episode settings change
+                    self.stop_recording()
+
                     # Apply jump strength and pipe speed settings
-                    self.bird.jump_strength = -jump_strength
-                    self.pipe_speed = pipe_speed
-                    self.pipe_interval = self.calculate_pipe_interval()
+                    physics_changed = (
+                        self.sim.jump_strength != -jump_strength
+                        or self.sim.pipe_speed != pipe_speed
+                    )
+                    self.sim.jump_strength = -jump_strength
+                    self.sim.pipe_speed = pipe_speed
 
                     # Apply training parameters
                     self.training_steps = int(training_steps)
-                    self.model.learning_rate = learning_rate
+                    self.learning_rate = learning_rate
+                    if self.model is not None:
+                        self.model.learning_rate = learning_rate
                     # Check if training mode has changed
                     if training_mode != self.training_active:
                         self.training_active = training_mode
                         self.reset_game()  # Reset game state
+                        if training_mode:
+                            self.start_training()
+                        else:
+                            self.stop_training()
+                    elif self.training_active and physics_changed:
+                        # The learner has to train on the physics the game now uses
+                        self.stop_training()
+                        self.start_training()
                 elif (
                     event.type == pygame.KEYDOWN and event.key == pygame.K_k
                 ):  # Save the model when 'K' is pressed
-                    self.settings_menu.save_training_results(self.model)
+                    policy = self.model.policy if self.model is not None else None
+                    self.settings_menu.save_training_results(
+                        self.checkpoints, policy, self.trained_steps, self.loaded_weights
+                    )
 
                 elif (
                     event.type == pygame.KEYDOWN and event.key == pygame.K_l
                 ):  # Load the model when 'L' is pressed
-                    self.settings_menu.load_training_results(self.model)
+                    self.settings_menu.load_training_results(
+                        self.checkpoint_loader, self.checkpoint_dir
+                    )
             else:
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_SPACE:
                         if self.game_active:
-                            self.bird.jump()
+                            self.pending_jump = True
                         else:
+                            self.replay_jumps = None
                             self.reset_game()
                     elif event.key == pygame.K_s:
                         self.settings_active = True
-
-    def update_game(self, current_time):
-        self.bird.update(self.gravity)
-        self.pipe_interval = self.calculate_pipe_interval()
-
-        # Only spawn a new pipe if there's enough distance from the last pipe
-        if current_time - self.last_pipe > self.pipe_interval and (
-            not self.pipes or self.width - self.pipes.sprites()[-1].rect.right > 200
-        ):
-            self.last_pipe = current_time
-            pipe_height = random.randint(50, self.height - self.pipe_gap - 50)
-            pipe_width = 60
-            top_pipe = Pipe(
-                self.width, 0, pipe_width, pipe_height, self.pipe_speed, is_top=True
-            )
-            bottom_pipe = Pipe(
-                self.width,
-                pipe_height + self.pipe_gap,
-                pipe_width,
-                self.height - pipe_height - self.pipe_gap,
-                self.pipe_speed,
-                is_top=False,
-            )
-            self.pipes.add(top_pipe, bottom_pipe)
-            self.all_sprites.add(top_pipe, bottom_pipe)
-
-        self.pipes.update()
-        self.check_collisions()
-        self.check_score()
-
-    def check_collisions(self):
-        if (
-            pygame.sprite.spritecollideany(self.bird, self.pipes)
-            or self.bird.rect.top < 0
-            or self.bird.rect.bottom > self.height
-        ):
-            self.game_active = False
-
-    def check_score(self):
-        for pipe in self.pipes:
-            if (
-                not pipe.scored
-                and pipe.rect.right < self.bird.rect.left
-                and pipe.is_top
-            ):
-                pipe.scored = True
-                self.score += 1
-                self.score_text.update_text(f"Score: {self.score}")
-
-    def train_and_update_game(self, current_time):
-
-        obs = self.env._get_observation()
-
-        action, _ = self.model.predict(obs, deterministic=False)
-
-        _, reward, done, _ = self.env.step(action, current_time)
-
-        # Debug output for action and reward
-        print(
-            f"Action: {'Jump' if action == 1 else 'No Jump'}, Reward: {reward}, Done: {done}"
-        )
+                    elif event.key == pygame.K_f:
+                        # Cycle through the fast-forward speeds
+                        speeds = self.fast_forward_speeds
+                        index = speeds.index(self.speed_multiplier)
+                        self.speed_multiplier = speeds[(index + 1) % len(speeds)]
+                    elif event.key == pygame.K_r:
+                        # Recording starts with the next episode
+                        self.record_replays = not self.record_replays
+                        if not self.record_replays:
+                            self.stop_recording()
+                    elif event.key == pygame.K_a:
+                        if self.policy is None:
+                            logger.warning(
+                                "No policy to autoplay with, train or export one to %s",
+                                self.policy_path,
+                            )
+                        else:
+                            self.autoplay = not self.autoplay
+                    elif event.key == pygame.K_p:
+                        self.profiler_overlay.toggle()
+                    elif event.key == pygame.K_o:
+                        self.profiler.dump(self.profile_path)
+                        logger.info("Wrote frame profile to %s", self.profile_path)
+
+    def update_game(self):
+        jump, self.pending_jump = self.pending_jump, False
+        if self.replay_jumps is not None:
+            jump = next(self.replay_jumps, None)
+            if jump is None:
+                # The recording ended, show the game over screen
+                self.replay_jumps = None
+                self.sim.game_active = False
+                return
+        if self.autoplay and self.replay_jumps is None:
+            # Step through the env so the policy sees its training decision gate
+            if self.env.decision_due():
+                self.policy_action = self.policy.predict(self.env._observe())
+            self.env.step(self.policy_action)
+        else:
+            self.sim.step(jump)
+        if not self.sim.game_active:
+            self.stop_recording()
+
+    def train_and_update_game(self):
+        # Show the newest policy published by the background learner
+        snapshot = self.trainer.latest_snapshot() if self.trainer else None
+        if snapshot is not None:
+            self.model.policy.load_state_dict(snapshot)
+            self.policy = NumpyPolicy.from_state_dict(snapshot)
+
+        # Copy, since the env overwrites its observation buffer on every step
+        obs = self.env._get_observation().copy()
+
+        # The env ignores actions between decisions, so only query the policy on them
+        if self.env.decision_due():
+            start = self.profiler.start()
+            self.policy_action = self.policy.predict(obs, deterministic=False)
+            self.profiler.stop("predict", start)
+        action = self.policy_action
+
+        start = self.profiler.start()
+        _, reward, terminated, truncated, _ = self.env.step(action)
+        done = terminated or truncated
+        self.profiler.stop("env_step", start)
 
         # Update scores in the Training UI
         self.training_ui.update_scores(reward, done)
@@ -270,19 +502,38 @@ class GameLoop:
             observation_labels, self.training_ui.current_score, action
         )
 
-        self.training_ui.update_progress(self.current_steps, self.training_steps)
+        trained_steps = self.trainer.num_timesteps if self.trainer else 0
+        self.training_ui.update_progress(trained_steps, self.training_steps)
 
         if done:
+            self.stop_recording()
             self.env.reset()
+            self.start_recording()
+
+    def draw_sprites(self):
+        # Sprites draw themselves so pipes can blit a slice of their shared column
+        for sprite in self.all_sprites:
+            sprite.draw(self.screen)
 
     def draw(self):
-        self.screen.fill((135, 206, 235))
+        if (
+            self.dirty_rendering
+            and self.game_active
+            and not self.training_active
+            and not self.settings_active
+        ):
+            self.draw_dirty()
+            return
+
+        # Overlays change the whole screen, so the next dirty frame repaints it all
+        self.full_redraw = True
+        self.screen.blit(self.background, (0, 0))
         if self.training_active:
-            self.all_sprites.draw(self.screen)
+            self.draw_sprites()
             self.score_text.draw(self.screen)
             self.training_ui.draw(self.screen)  # Display training progress
         elif self.game_active:
-            self.all_sprites.draw(self.screen)
+            self.draw_sprites()
             self.score_text.draw(self.screen)
         else:
             self.game_over_text.draw(self.screen)
@@ -292,4 +543,17 @@ class GameLoop:
             self.instructions_text.draw(self.screen)
         if self.settings_active:
             self.settings_menu.draw(self.screen)
-        pygame.display.flip()
+        self.profiler_overlay.draw(self.screen)
+        self.update_rects = None
+
+    def draw_dirty(self):
+        if self.full_redraw:
+            self.render_group.repaint_rect(self.screen.get_rect())
+            self.full_redraw = False
+        self.update_rects = self.render_group.draw(self.screen)
+
+    def present(self):
+        if self.update_rects is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(self.update_rects)
@@ -1,6 +1,6 @@
 import pygame
 
-class GameObject(pygame.sprite.Sprite):
+class GameObject(pygame.sprite.DirtySprite):
     def __init__(self):
         super().__init__()
         self.image = None  # Will be set in subclasses
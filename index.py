@@ -1,14 +1,25 @@
+import argparse
 import pygame
 from game_loop import GameLoop
+from training_log import configure_logging
 
 def main():
+    parser = argparse.ArgumentParser(description="Play Flappy Polygon")
+    parser.add_argument(
+        "--training-workers",
+        type=int,
+        default=0,
+        help="Processes that play the training games, 0 plays them in the learner thread",
+    )
+    args = parser.parse_args()
+    configure_logging()
     pygame.init()
     WIDTH, HEIGHT = 400, 600
     screen = pygame.display.set_mode((WIDTH, HEIGHT))
     pygame.display.set_caption("Flappy Polygon")
     clock = pygame.time.Clock()
 
-    game = GameLoop(screen, clock)
+    game = GameLoop(screen, clock, training_workers=args.training_workers)
     game.run()
 
 if __name__ == "__main__":
@@ -0,0 +1,156 @@
+import argparse
+import queue
+import threading
+import time
+from concurrent.futures import Future
+import numpy as np
+from flappy_env import DECISION_INTERVAL, FlappyEnv
+from numpy_policy import NumpyPolicy
+from simulation import Simulation
+from training_log import configure_logging, logger
+
+
+class InferenceServer:
+    """Runs a policy on observations batched from many concurrent games.
+
+    Games call submit() from their own threads. The server thread takes the
+    first waiting observation, keeps collecting for up to max_latency seconds
+    or until max_batch_size, then evaluates predict_fn on the whole batch once.
+    predict_fn maps an (n, obs_size) array to n actions.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=64, max_latency=0.002):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.batches = 0
+        self.requests = 0
+        self._queue = queue.SimpleQueue()
+        self._observations = None  # (max_batch_size, obs_size), allocated on first use
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def submit(self, observation):
+        """Queue one observation; the returned Future resolves to its action."""
+        future = Future()
+        self._queue.put((observation, future))
+        return future
+
+    def predict(self, observation):
+        return self.submit(observation).result()
+
+    def _run(self):
+        while True:
+            request = self._queue.get()
+            if request is None:
+                return
+            batch = [request]
+            deadline = time.perf_counter() + self.max_latency
+            stopping = False
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.perf_counter()
+                try:
+                    if timeout > 0:
+                        request = self._queue.get(timeout=timeout)
+                    else:
+                        request = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    stopping = True
+                    break
+                batch.append(request)
+            self._process(batch)
+            if stopping:
+                return
+
+    def _process(self, batch):
+        if self._observations is None:
+            size = np.shape(batch[0][0])[-1]
+            self._observations = np.empty((self.max_batch_size, size), dtype=np.float32)
+        observations = self._observations[: len(batch)]
+        for row, (observation, _) in zip(observations, batch):
+            row[:] = observation
+        try:
+            actions = self.predict_fn(observations)
+        except Exception as error:
+            for _, future in batch:
+                future.set_exception(error)
+            return
+        for action, (_, future) in zip(actions, batch):
+            future.set_result(int(action))
+        self.batches += 1
+        self.requests += len(batch)
+
+
+def play_games(server, num_games, ticks):
+    """Play num_games headless games in threads through the server."""
+
+    def play(seed):
+        # One request per decision, the ticks in between only repeat it
+        env = FlappyEnv(Simulation(seed=seed), action_repeat=DECISION_INTERVAL)
+        obs, _ = env.reset()
+        for _ in range(ticks // DECISION_INTERVAL):
+            obs, _, terminated, truncated, _ = env.step(server.predict(obs))
+            if terminated or truncated:
+                obs, _ = env.reset()
+
+    threads = [threading.Thread(target=play, args=(seed,)) for seed in range(num_games)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Play many AI games through one batched inference server"
+    )
+    parser.add_argument("--model", default=None, help="Saved PPO model, random policy if omitted")
+    parser.add_argument("--games", type=int, default=32)
+    parser.add_argument("--ticks", type=int, default=2000, help="Ticks per game")
+    parser.add_argument("--max-latency", type=float, default=0.002, help="Seconds")
+    parser.add_argument(
+        "--torch", action="store_true", help="Use PPO.predict instead of the NumPy fast path"
+    )
+    args = parser.parse_args()
+    configure_logging()
+
+    from stable_baselines3 import PPO
+
+    if args.model:
+        model = PPO.load(args.model)
+    else:
+        model = PPO("MlpPolicy", FlappyEnv(Simulation()), verbose=0)
+    if args.torch:
+        predict_fn = lambda batch: model.predict(batch, deterministic=True)[0]
+    else:
+        predict_fn = NumpyPolicy.from_sb3(model.policy).predict
+
+    server = InferenceServer(
+        predict_fn, max_batch_size=args.games, max_latency=args.max_latency
+    )
+    server.start()
+    elapsed = play_games(server, args.games, args.ticks)
+    server.stop()
+    logger.info(
+        "%d games: %.0f decisions/s, mean batch %.1f",
+        args.games,
+        server.requests / elapsed,
+        server.requests / max(server.batches, 1),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import argparse
+import re
+import numpy as np
+
+ACTIVATIONS = {"tanh": np.tanh, "relu": lambda x: np.maximum(x, 0, out=x)}
+
+
+class NumpyPolicy:
+    """The actor half of an SB3 MlpPolicy evaluated with NumPy.
+
+    Holds the policy_net layers and action_net of a discrete-action PPO policy.
+    For one 11-float observation this is much cheaper than PPO.predict, which
+    goes through torch tensors and SB3's input checks on every call.
+    """
+
+    def __init__(self, weights, biases, activation="tanh", seed=None):
+        self.weights = [np.ascontiguousarray(w.T, dtype=np.float32) for w in weights]
+        self.biases = [np.asarray(b, dtype=np.float32) for b in biases]
+        self.activation = activation
+        self._activation = ACTIVATIONS[activation]
+        self.rng = np.random.default_rng(seed)
+
+    @classmethod
+    def from_state_dict(cls, state_dict, activation="tanh", seed=None):
+        """Build from ActorCriticPolicy.state_dict(), as published by BackgroundTrainer."""
+        layers = {}
+        for key in state_dict:
+            match = re.fullmatch(r"mlp_extractor\.policy_net\.(\d+)\.weight", key)
+            if match:
+                layers[int(match.group(1))] = key[: -len("weight")]
+        prefixes = [layers[index] for index in sorted(layers)] + ["action_net."]
+        weights = [_to_numpy(state_dict[prefix + "weight"]) for prefix in prefixes]
+        biases = [_to_numpy(state_dict[prefix + "bias"]) for prefix in prefixes]
+        return cls(weights, biases, activation, seed)
+
+    @classmethod
+    def from_sb3(cls, policy, seed=None):
+        activation = policy.activation_fn.__name__.lower()
+        return cls.from_state_dict(policy.state_dict(), activation, seed)
+
+    def save(self, path):
+        arrays = {}
+        for i, (weight, bias) in enumerate(zip(self.weights, self.biases)):
+            arrays[f"weight_{i}"] = weight.T
+            arrays[f"bias_{i}"] = bias
+        np.savez(path, activation=self.activation, **arrays)
+
+    @classmethod
+    def load(cls, path, seed=None):
+        """Load a policy written by save(); needs only NumPy."""
+        with np.load(path) as data:
+            count = sum(1 for key in data.files if key.startswith("weight_"))
+            weights = [data[f"weight_{i}"] for i in range(count)]
+            biases = [data[f"bias_{i}"] for i in range(count)]
+            activation = str(data["activation"])
+        return cls(weights, biases, activation, seed)
+
+    def logits(self, observations):
+        x = np.asarray(observations, dtype=np.float32)
+        last = len(self.weights) - 1
+        for i, (weight, bias) in enumerate(zip(self.weights, self.biases)):
+            x = x @ weight
+            x += bias
+            if i < last:
+                x = self._activation(x)
+        return x
+
+    def predict(self, observations, deterministic=True):
+        """Actions for one observation or a batch, like PPO.predict without the state."""
+        logits = self.logits(observations)
+        if not deterministic:
+            # Gumbel-max trick: argmax of perturbed logits samples the softmax
+            logits = logits - np.log(-np.log(self.rng.random(logits.shape)))
+        return np.argmax(logits, axis=-1)
+
+
+def _to_numpy(value):
+    if hasattr(value, "detach"):
+        value = value.detach().cpu().numpy()
+    return np.asarray(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Export a saved PPO policy to a NumPy weight file"
+    )
+    parser.add_argument("model", nargs="?", default="ppo_flappy.zip")
+    parser.add_argument("output", nargs="?", default="ppo_flappy.npz")
+    args = parser.parse_args()
+
+    from stable_baselines3 import PPO
+
+    NumpyPolicy.from_sb3(PPO.load(args.model, device="cpu").policy).save(args.output)
+    print(f"Exported {args.model} to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
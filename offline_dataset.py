@@ -0,0 +1,138 @@
+import argparse
+import glob
+import numpy as np
+from flappy_env import DECISION_INTERVAL, FlappyEnv
+from replay import Replay
+from training_log import configure_logging, logger
+
+
+def replay_transitions(replay, action_repeat=DECISION_INTERVAL):
+    """Recompute FlappyEnv transitions of a replay, one per decision.
+
+    Ticks are grouped into the action_repeat windows that a policy trained with
+    FlappyEnv(action_repeat=...) acts on. A window's action is whether a jump
+    was made in it and its reward is summed over its ticks. Returns
+    (observations, actions, rewards, dones) where observations[t] is what the
+    player saw before choosing actions[t].
+    """
+    sim = replay.create_simulation()
+    env = FlappyEnv(sim)
+    jumps = replay.jumps  # Read from the memory map in one go
+    steps = -(-len(jumps) // action_repeat)
+    observations = np.empty((steps, 11), dtype=np.float32)
+    actions = np.empty(steps, dtype=np.int64)
+    rewards = np.zeros(steps, dtype=np.float32)
+    dones = np.zeros(steps, dtype=bool)
+    for t in range(steps):
+        observations[t] = env._get_observation()
+        window = jumps[t * action_repeat : (t + 1) * action_repeat]
+        actions[t] = window.any()
+        for jump in window:
+            sim.step(bool(jump))
+            env._observe()
+            rewards[t] += env._calculate_reward()
+    if steps:
+        dones[-1] = not sim.game_active
+    return observations, actions, rewards, dones
+
+
+class ReplayDataset:
+    """Streams shuffled minibatches of transitions from many replay files.
+
+    Only the shuffle buffer is held in memory: episodes are replayed into it
+    until it is full, then it is shuffled and drained as minibatches.
+    """
+
+    def __init__(self, paths, batch_size=256, buffer_size=65536, seed=None):
+        self.paths = list(paths)
+        self.batch_size = batch_size
+        self.buffer_size = buffer_size
+        self.rng = np.random.default_rng(seed)
+        self.observations = np.empty((buffer_size, 11), dtype=np.float32)
+        self.actions = np.empty(buffer_size, dtype=np.int64)
+        self.rewards = np.empty(buffer_size, dtype=np.float32)
+        self.dones = np.empty(buffer_size, dtype=bool)
+
+    def __iter__(self):
+        size = 0
+        for path in self.rng.permutation(self.paths):
+            transitions = replay_transitions(Replay(path))
+            start = 0
+            ticks = len(transitions[1])
+            while start < ticks:
+                count = min(ticks - start, self.buffer_size - size)
+                for buffer, values in zip(self._buffers(), transitions):
+                    buffer[size : size + count] = values[start : start + count]
+                size += count
+                start += count
+                if size == self.buffer_size:
+                    yield from self._drain(size)
+                    size = 0
+        yield from self._drain(size)
+
+    def _buffers(self):
+        return self.observations, self.actions, self.rewards, self.dones
+
+    def _drain(self, size):
+        order = self.rng.permutation(size)
+        for start in range(0, size, self.batch_size):
+            index = order[start : start + self.batch_size]
+            yield tuple(buffer[index] for buffer in self._buffers())
+
+
+def pretrain_policy(model, dataset, epochs=1, learning_rate=1e-3):
+    """Behavior cloning: fit the policy to the recorded actions."""
+    import torch as th
+
+    policy = model.policy
+    policy.set_training_mode(True)
+    optimizer = th.optim.Adam(policy.parameters(), lr=learning_rate)
+    for epoch in range(epochs):
+        losses = []
+        for observations, actions, _, _ in dataset:
+            obs_tensor, _ = policy.obs_to_tensor(observations)
+            distribution = policy.get_distribution(obs_tensor)
+            loss = -distribution.log_prob(th.as_tensor(actions, device=policy.device)).mean()
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+            losses.append(loss.item())
+        logger.info(
+            "Pretraining epoch %d: mean loss %.4f over %d batches",
+            epoch + 1,
+            np.mean(losses) if losses else float("nan"),
+            len(losses),
+        )
+    policy.set_training_mode(False)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Pretrain the PPO policy on recorded replays"
+    )
+    parser.add_argument("replays", nargs="+", help="Replay files or glob patterns")
+    parser.add_argument("--epochs", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--learning-rate", type=float, default=1e-3)
+    parser.add_argument("--model", default=None, help="Existing model to start from")
+    parser.add_argument("--output", default="ppo_flappy.zip")
+    args = parser.parse_args()
+    configure_logging()
+
+    from stable_baselines3 import PPO
+    from simulation import Simulation
+
+    paths = [path for pattern in args.replays for path in glob.glob(pattern)]
+    dataset = ReplayDataset(paths, batch_size=args.batch_size)
+    env = FlappyEnv(Simulation())
+    if args.model:
+        model = PPO.load(args.model, env=env)
+    else:
+        model = PPO("MlpPolicy", env, verbose=0)
+    pretrain_policy(model, dataset, epochs=args.epochs, learning_rate=args.learning_rate)
+    model.save(args.output)
+    logger.info("Saved pretrained model to %s", args.output)
+
+
+if __name__ == "__main__":
+    main()
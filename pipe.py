@@ -3,18 +3,27 @@ from game_object import GameObject
 from shape_renderer import ShapeRenderer
 
 class Pipe(GameObject):
-    def __init__(self, x, y, width, height, speed, is_top=True):
+    def __init__(self, x, y, width, height, is_top=True, column_height=None):
         super().__init__()
-        self.speed = speed
-        self.scored = False  # Flag to check if the bird has passed this pipe
-        self.trained = False # Flag to check if the pipe has been trained on
         self.is_top = is_top  # Indicates whether this is the top or bottom pipe
 
-        # Create the rectangle surface for the pipe
-        self.image = ShapeRenderer.create_rectangle_surface(width, height, (34, 139, 34))
-        self.rect = self.image.get_rect(topleft=(x, y))
+        # Every pipe draws a slice of one shared, pre-rendered column
+        column_height = max(height, column_height or height)
+        self.image = ShapeRenderer.cached_rectangle_surface(
+            width, column_height, (34, 139, 34)
+        )
+        # Top pipes show the column's lower end, bottom pipes its upper end
+        area_y = column_height - height if is_top else 0
+        self.area = pygame.Rect(0, area_y, width, height)
+        self.source_rect = self.area  # Used by LayeredDirty's clipped blit
+        self.rect = pygame.Rect(x, y, width, height)
 
-    def update(self):
-        self.rect.x -= self.speed
-        if self.rect.right < 0:
-            self.kill()
\ No newline at end of file
+    def update(self, x):
+        # Mirror the simulated pipe position; movement lives in Simulation
+        x = round(x)
+        if x != self.rect.x:
+            self.rect.x = x
+            self.dirty = 1
+
+    def draw(self, surface):
+        surface.blit(self.image, self.rect, self.area)
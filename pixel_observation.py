@@ -0,0 +1,93 @@
+import os
+
+# Frames are drawn on off-screen surfaces, no window is needed
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+import pygame
+from gymnasium import spaces
+from flappy_env import FlappyEnv
+
+# Integer luma weights (ITU-R BT.601) scaled by 256
+GRAY_WEIGHTS = (77, 150, 29)
+
+
+class PixelFrameStack:
+    """The last num_frames downsampled grayscale frames of a surface.
+
+    Frames are read through a pixels3d view of the surface, sampled every
+    `scale` pixels and converted to gray into preallocated buffers. The ring
+    holds every frame twice, num_frames apart, so the stack in time order is
+    always one contiguous slice and never has to be copied together.
+    """
+
+    def __init__(self, width, height, scale=5, num_frames=4):
+        self.scale = scale
+        self.num_frames = num_frames
+        self.shape = (height // scale, width // scale)
+        self._ring = np.zeros((2 * num_frames, *self.shape), dtype=np.uint8)
+        self._gray = np.empty(self.shape[::-1], dtype=np.uint16)  # Surface (x, y) order
+        self._channel = np.empty(self.shape[::-1], dtype=np.uint16)
+        self._next = 0
+
+    def _to_gray(self, surface, out):
+        pixels = pygame.surfarray.pixels3d(surface)
+        try:
+            columns, rows = self.shape[1] * self.scale, self.shape[0] * self.scale
+            sampled = pixels[:columns:self.scale, :rows:self.scale]
+            np.multiply(
+                sampled[..., 0], GRAY_WEIGHTS[0], out=self._gray, dtype=np.uint16
+            )
+            for channel, weight in zip((1, 2), GRAY_WEIGHTS[1:]):
+                np.multiply(
+                    sampled[..., channel], weight, out=self._channel, dtype=np.uint16
+                )
+                self._gray += self._channel
+        finally:
+            del pixels  # Unlocks the surface for the next frame's drawing
+        np.right_shift(self._gray.T, 8, out=out, casting="unsafe")
+
+    def reset(self, surface):
+        """Fill the whole stack with the first frame of an episode."""
+        self._to_gray(surface, self._ring[0])
+        self._ring[1:] = self._ring[0]
+        self._next = 0
+        return self.stack()
+
+    def push(self, surface):
+        index = self._next
+        self._to_gray(surface, self._ring[index])
+        self._ring[index + self.num_frames] = self._ring[index]
+        self._next = (index + 1) % self.num_frames
+        return self.stack()
+
+    def stack(self):
+        """Frames oldest first, shape (num_frames, height, width). Overwritten by push()."""
+        return self._ring[self._next : self._next + self.num_frames]
+
+
+class PixelFlappyEnv(FlappyEnv):
+    """FlappyEnv observed through stacked grayscale frames, for CnnPolicy.
+
+    Rewards and termination are the feature env's; only the observation differs.
+    """
+
+    def __init__(self, sim=None, frame_scale=5, frame_stack=4, **kwargs):
+        super().__init__(sim, **kwargs)
+        self.frames = PixelFrameStack(
+            self.sim.width, self.sim.height, frame_scale, frame_stack
+        )
+        self.observation_space = spaces.Box(
+            low=0, high=255, shape=(frame_stack, *self.frames.shape), dtype=np.uint8
+        )
+
+    def reset(self, seed=None, options=None):
+        _, info = super().reset(seed=seed, options=options)
+        self.frames.reset(self._draw_frame())
+        return self.frames.stack().copy(), info
+
+    def step(self, action):
+        _, reward, terminated, truncated, info = super().step(action)
+        self.frames.push(self._draw_frame())
+        # stack() is a view of the ring, callers get frames the next push keeps
+        return self.frames.stack().copy(), reward, terminated, truncated, info
@@ -1,55 +1,45 @@
-import pygame
 from game_object import GameObject
 from shape_renderer import ShapeRenderer
-import math
 
 
 class PlayerBird(GameObject):
-    def __init__(self, x, y, jump_strength):
+    # Rotation atlases shared by every bird with the same shape and color
+    _rotation_atlases = {}
+    min_angle = -90
+    max_angle = 90
+
+    def __init__(self, x, y, rotate=True):
         super().__init__()
-        self.velocity = 0
-        self.jump_strength = jump_strength
         self.angle = 0  # For rotation effect
-        self.jump_cooldown = 250  # milliseconds
-        self.last_jump_time = 0
+        self.rotate = rotate  # Headless renderers can skip rotation entirely
 
         # Define the polygon points for the bird (triangle)
         size = 20
         self.points = [(0, -size // 2), (size // 2, size // 2), (-size // 2, size // 2)]
+        color = (255, 255, 0)
 
         # Create the polygon surface
-        self.image_original = ShapeRenderer.create_polygon_surface(
-            self.points, (255, 255, 0)
-        )
+        self.image_original = ShapeRenderer.create_polygon_surface(self.points, color)
+        if rotate:
+            key = (tuple(self.points), color)
+            if key not in self._rotation_atlases:
+                self._rotation_atlases[key] = ShapeRenderer.create_rotation_atlas(
+                    self.image_original, self.min_angle, self.max_angle
+                )
+            self.rotation_atlas = self._rotation_atlases[key]
         self.image = self.image_original
         self.rect = self.image.get_rect(center=(x, y))
 
-    def update(self, gravity):
-        self.velocity += gravity
-        self.rect.y += self.velocity
-
-        # Optional: Rotate the bird based on velocity
-        self.angle = -self.velocity * 3  # Adjust multiplier for effect
-        self.image = pygame.transform.rotate(self.image_original, self.angle)
-        self.rect = self.image.get_rect(center=self.rect.center)
-
-    def jump(self):
-        current_time = pygame.time.get_ticks()
-        time_since_last_jump = current_time - self.last_jump_time
-        if time_since_last_jump < self.jump_cooldown:
-            # Scale the jump strength based on the remaining cooldown time
-            scale_factor = time_since_last_jump / self.jump_cooldown
-            scaled_jump_strength = self.jump_strength * scale_factor
-        else:
-            scaled_jump_strength = self.jump_strength
-
-        self.velocity = scaled_jump_strength
-        self.last_jump_time = current_time
-
-    def no_jump(self):
-        pass
-
-    def can_jump(self):
-        """Return True if the bird can jump based on cooldown."""
-        current_time = pygame.time.get_ticks()
-        return current_time - self.last_jump_time >= self.jump_cooldown
+    def update(self, bird, alpha=1.0):
+        # Mirror the simulated bird state; physics lives in Simulation
+        y = bird.prev_y + (bird.y - bird.prev_y) * alpha
+        self.angle = bird.angle
+        old_image, old_rect = self.image, self.rect.copy()
+        if self.rotate:
+            # Look up the nearest whole-degree rotation instead of rotating every frame
+            angle = min(max(round(self.angle), self.min_angle), self.max_angle)
+            self.image = self.rotation_atlas[angle - self.min_angle]
+            self.rect.size = self.image.get_size()
+        self.rect.center = (round(bird.x), round(y))
+        if self.image is not old_image or self.rect != old_rect:
+            self.dirty = 1
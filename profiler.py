@@ -0,0 +1,131 @@
+import json
+import time
+import numpy as np
+import pygame
+
+PHASES = (
+    "wait",
+    "events",
+    "simulate",
+    "predict",
+    "env_step",
+    "sync",
+    "draw",
+    "flip",
+)
+
+
+class FrameProfiler:
+    """Per-frame time spent in each phase of the game loop.
+
+    Phases may run several times per frame (one simulate per tick), their
+    times are summed until end_frame() stores the frame in a ring buffer of
+    the last `window` frames.
+    """
+
+    def __init__(self, window=600, phases=PHASES):
+        self.phases = phases
+        self.index = {name: i for i, name in enumerate(phases)}
+        self.window = window
+        self.samples = np.zeros((len(phases), window), dtype=np.int64)
+        self.frames = 0
+        self._current = [0] * len(phases)
+
+    @staticmethod
+    def start():
+        return time.perf_counter_ns()
+
+    def stop(self, phase, start):
+        self._current[self.index[phase]] += time.perf_counter_ns() - start
+
+    def end_frame(self):
+        self.samples[:, self.frames % self.window] = self._current
+        self.frames += 1
+        self._current = [0] * len(self.phases)
+
+    def summary(self):
+        """Phase -> mean, p50, p95, p99 and max in milliseconds over the window."""
+        count = min(self.frames, self.window)
+        if count == 0:
+            return {}
+        samples = self.samples[:, :count] / 1e6
+        p50, p95, p99 = np.percentile(samples, (50, 95, 99), axis=1)
+        means = samples.mean(axis=1)
+        maxima = samples.max(axis=1)
+        return {
+            name: {
+                "mean_ms": float(means[i]),
+                "p50_ms": float(p50[i]),
+                "p95_ms": float(p95[i]),
+                "p99_ms": float(p99[i]),
+                "max_ms": float(maxima[i]),
+            }
+            for i, name in enumerate(self.phases)
+        }
+
+    def dump(self, path):
+        # Samples are written oldest first
+        count = min(self.frames, self.window)
+        order = np.arange(self.frames - count, self.frames) % self.window
+        with open(path, "w") as f:
+            json.dump(
+                {
+                    "frames": self.frames,
+                    "summary": self.summary(),
+                    "samples_ms": {
+                        name: (self.samples[i, order] / 1e6).tolist()
+                        for i, name in enumerate(self.phases)
+                    },
+                },
+                f,
+                indent=2,
+            )
+
+
+class ProfilerOverlay(pygame.sprite.DirtySprite):
+    """Table of phase percentiles, redrawn every `refresh_interval` frames."""
+
+    def __init__(self, profiler, x, y, refresh_interval=30):
+        super().__init__()
+        self.profiler = profiler
+        self.refresh_interval = refresh_interval
+        self.font = pygame.font.SysFont("monospace", 14)
+        self.line_height = self.font.get_linesize()
+        width = self.font.size(self._header())[0] + 8
+        self.image = pygame.Surface(
+            (width, self.line_height * (len(profiler.phases) + 1) + 8), pygame.SRCALPHA
+        )
+        self.rect = self.image.get_rect(topright=(x, y))
+        self.visible = 0
+        self.refresh()
+
+    @staticmethod
+    def _header():
+        return f"{'phase':10s} {'p50':>6s} {'p95':>6s} {'p99':>6s} ms"
+
+    def refresh(self):
+        self.image.fill((0, 0, 0, 160))
+        lines = [self._header()]
+        for name, stats in self.profiler.summary().items():
+            lines.append(
+                f"{name:10s} {stats['p50_ms']:6.2f} {stats['p95_ms']:6.2f} "
+                f"{stats['p99_ms']:6.2f}"
+            )
+        for i, line in enumerate(lines):
+            surface = self.font.render(line, True, (255, 255, 255))
+            self.image.blit(surface, (4, 4 + i * self.line_height))
+        self.dirty = 1
+
+    def update(self):
+        if self.visible and self.profiler.frames % self.refresh_interval == 0:
+            self.refresh()
+
+    def toggle(self):
+        self.visible = 0 if self.visible else 1
+        self.dirty = 1
+        if self.visible:
+            self.refresh()
+
+    def draw(self, screen):
+        if self.visible:
+            screen.blit(self.image, self.rect)
@@ -0,0 +1,151 @@
+import argparse
+import json
+import os
+import struct
+import numpy as np
+from flappy_env import FlappyEnv
+from simulation import Simulation
+
+# File layout: fixed header, settings as JSON, then one record per tick.
+# A record is one action byte (bit 0 = jump) optionally followed by the
+# 11 float32 observation features after that tick.
+MAGIC = b"FPRP"
+VERSION = 1
+HEADER = struct.Struct("<4sHHqI")  # magic, version, flags, seed, settings length
+FLAG_OBSERVATIONS = 1
+JUMP_BIT = 1
+
+# Simulation attributes needed to reproduce an episode
+SETTINGS = (
+    "width",
+    "height",
+    "gravity",
+    "jump_strength",
+    "pipe_speed",
+    "pipe_gap",
+    "collision_mode",
+)
+
+
+def record_dtype(has_observations):
+    if has_observations:
+        return np.dtype([("action", np.uint8), ("observation", "<f4", (11,))])
+    return np.dtype([("action", np.uint8)])
+
+
+class ReplayRecorder:
+    """Appends the ticks of one episode to a replay file.
+
+    Attach it as Simulation.recorder right after the episode's reset; the
+    simulation then reports every tick's jump bit.
+    """
+
+    def __init__(self, path, sim, record_observations=False):
+        self.path = path
+        self.record_observations = record_observations
+        self.dtype = record_dtype(record_observations)
+        # FlappyEnv defines the observation, reuse it on the recorded simulation
+        self._env = FlappyEnv(sim) if record_observations else None
+        self._record = np.zeros(1, dtype=self.dtype)
+        self.ticks = 0
+
+        settings = json.dumps({name: getattr(sim, name) for name in SETTINGS}).encode()
+        flags = FLAG_OBSERVATIONS if record_observations else 0
+        self._file = open(path, "wb")
+        self._file.write(HEADER.pack(MAGIC, VERSION, flags, sim.episode_seed, len(settings)))
+        self._file.write(settings)
+
+    def record(self, jump):
+        record = self._record
+        record["action"] = JUMP_BIT if jump else 0
+        if self._env is not None:
+            record["observation"] = self._env._observe()
+        self._file.write(record.tobytes())
+        self.ticks += 1
+
+    def close(self):
+        self._file.close()
+
+
+class Replay:
+    """A replay file memory-mapped for reading."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            magic, version, flags, self.seed, settings_length = HEADER.unpack(
+                f.read(HEADER.size)
+            )
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path} is not a version {VERSION} replay file")
+            self.settings = json.loads(f.read(settings_length))
+        self.has_observations = bool(flags & FLAG_OBSERVATIONS)
+        self.dtype = record_dtype(self.has_observations)
+        offset = HEADER.size + settings_length
+        self.ticks = (os.path.getsize(path) - offset) // self.dtype.itemsize
+
+        if self.ticks:
+            self.records = np.memmap(
+                path, dtype=self.dtype, mode="r", offset=offset, shape=(self.ticks,)
+            )
+        else:
+            self.records = np.zeros(0, dtype=self.dtype)  # mmap cannot map zero bytes
+
+    @property
+    def jumps(self):
+        return (self.records["action"] & JUMP_BIT).astype(bool)
+
+    @property
+    def observations(self):
+        return self.records["observation"] if self.has_observations else None
+
+    def create_simulation(self):
+        sim = Simulation(**self.settings)
+        sim.reset(self.seed)
+        return sim
+
+    def play(self, sim=None):
+        """Step a simulation through the recorded ticks, yielding it after each one."""
+        if sim is None:
+            sim = self.create_simulation()
+        for jump in self.jumps:
+            sim.step(bool(jump))
+            yield sim
+
+    def run_headless(self):
+        sim = None
+        for sim in self.play():
+            pass
+        return sim or self.create_simulation()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded episode")
+    parser.add_argument("path")
+    parser.add_argument(
+        "--headless", action="store_true", help="Reconstruct without opening a window"
+    )
+    args = parser.parse_args()
+
+    replay = Replay(args.path)
+    if args.headless:
+        sim = replay.run_headless()
+        print(
+            f"{replay.ticks} ticks, score {sim.score}, "
+            f"{'game over' if not sim.game_active else 'still alive'}"
+        )
+        return
+
+    import pygame
+    from game_loop import GameLoop
+
+    pygame.init()
+    screen = pygame.display.set_mode((replay.settings["width"], replay.settings["height"]))
+    pygame.display.set_caption("Flappy Polygon Replay")
+    game = GameLoop(screen, pygame.time.Clock())
+    game.play_replay(replay)
+    game.run()
+
+
+if __name__ == "__main__":
+    main()
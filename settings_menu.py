@@ -1,9 +1,14 @@
 import os
 import pygame
+from checkpointing import latest_checkpoint
+from text_cache import TextCache
+from training_log import logger
 
 
 class Slider:
-    def __init__(self, x, y, width, min_value, max_value, initial_value, label):
+    def __init__(
+        self, x, y, width, min_value, max_value, initial_value, label, text_cache=None
+    ):
         self.rect = pygame.Rect(x, y, width, 20)
         self.min_value = min_value
         self.max_value = max_value
@@ -12,7 +17,9 @@ class Slider:
         self.handle_rect = pygame.Rect(0, 0, 10, 20)
         self.update_handle_position()
         self.dragging = False
-        self.font = pygame.font.SysFont(None, 24)
+        self.text_cache = text_cache or TextCache(pygame.font.SysFont(None, 24))
+        self.label_surface = None
+        self.label_value = None  # Value the label surface was rendered for
 
     def update_handle_position(self):
         ratio = (self.value - self.min_value) / (self.max_value - self.min_value)
@@ -46,18 +53,21 @@ class Slider:
     def draw(self, surface):
         pygame.draw.rect(surface, (200, 200, 200), self.rect)
         pygame.draw.rect(surface, (100, 100, 100), self.handle_rect)
-        label_surface = self.font.render(
-            f"{self.label}: {self.value:.2f}", True, (0, 0, 0)
-        )
-        surface.blit(label_surface, (self.rect.x, self.rect.y - 25))
+        # Only look up a new label when the value changed, e.g. during a drag
+        if self.value != self.label_value:
+            self.label_surface = self.text_cache.render(
+                f"{self.label}: {self.value:.2f}", (0, 0, 0)
+            )
+            self.label_value = self.value
+        surface.blit(self.label_surface, (self.rect.x, self.rect.y - 25))
 
 
 class Toggle:
-    def __init__(self, x, y, label, initial_state=False):
+    def __init__(self, x, y, label, initial_state=False, text_cache=None):
         self.rect = pygame.Rect(x, y, 40, 20)
         self.state = initial_state
         self.label = label
-        self.font = pygame.font.SysFont(None, 24)
+        self.text_cache = text_cache or TextCache(pygame.font.SysFont(None, 24))
 
     def handle_event(self, event):
         if event.type == pygame.MOUSEBUTTONDOWN:
@@ -66,8 +76,8 @@ class Toggle:
 
     def draw(self, surface):
         pygame.draw.rect(surface, (0, 255, 0) if self.state else (255, 0, 0), self.rect)
-        label_surface = self.font.render(
-            f"{self.label}: {'On' if self.state else 'Off'}", True, (0, 0, 0)
+        label_surface = self.text_cache.render(
+            f"{self.label}: {'On' if self.state else 'Off'}", (0, 0, 0)
         )
         surface.blit(label_surface, (self.rect.x + 50, self.rect.y))
 
@@ -88,24 +98,29 @@ class SettingsMenu:
         self.font = pygame.font.SysFont(None, 48)
         self.title_surface = self.font.render("Settings", True, (0, 0, 0))
         self.title_rect = self.title_surface.get_rect(center=(self.width // 2, 50))
+        # One font lookup shared by every slider and toggle label
+        label_cache = TextCache(pygame.font.SysFont(None, 24))
 
         # Initialize sliders
         self.jump_strength_slider = Slider(
-            100, 150, 200, 5, 15, abs(bird_jump_strength), "Jump Strength"
+            100, 150, 200, 5, 15, abs(bird_jump_strength), "Jump Strength", label_cache
+        )
+        self.pipe_speed_slider = Slider(
+            100, 250, 200, 1, 10, pipe_speed, "Pipe Speed", label_cache
         )
-        self.pipe_speed_slider = Slider(100, 250, 200, 1, 10, pipe_speed, "Pipe Speed")
         self.training_steps_slider = Slider(
-            100, 350, 200, 1000, 50000, training_steps, "Training Steps"
+            100, 350, 200, 1000, 50000, training_steps, "Training Steps", label_cache
         )
         # learning rate for PPO
         self.learning_rate_slider = Slider(
-            100, 450, 200, 0.0001, 0.1, learning_rate, "Learning Rate"
+            100, 450, 200, 0.0001, 0.1, learning_rate, "Learning Rate", label_cache
         )
 
         # Training mode toggle
         self.training_mode_toggle = Toggle(
-            100, 550, "Training Mode", initial_state=training_mode
+            100, 550, "Training Mode", initial_state=training_mode, text_cache=label_cache
         )
+        self.static_layer = self.create_static_layer()
 
         self.sliders = [
             self.jump_strength_slider,
@@ -120,18 +135,11 @@ class SettingsMenu:
             slider.handle_event(event)
         self.training_mode_toggle.handle_event(event)
 
-    def draw(self, surface):
-        overlay = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
-        overlay.fill((255, 255, 255, 200))
-        surface.blit(overlay, (0, 0))
-
-        # Draw the title
-        surface.blit(self.title_surface, self.title_rect)
-
-        # Draw sliders and toggle
-        for slider in self.sliders:
-            slider.draw(surface)
-        self.training_mode_toggle.draw(surface)
+    def create_static_layer(self):
+        # Overlay, title and instructions never change, so they are drawn once
+        layer = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+        layer.fill((255, 255, 255, 200))
+        layer.blit(self.title_surface, self.title_rect)
 
         instructions_font = pygame.font.SysFont(None, 16)
         instructions_surface = instructions_font.render(
@@ -140,7 +148,16 @@ class SettingsMenu:
         instructions_rect = instructions_surface.get_rect(
             center=(self.width // 2, self.height - 30)
         )
-        surface.blit(instructions_surface, instructions_rect)
+        layer.blit(instructions_surface, instructions_rect)
+        return layer
+
+    def draw(self, surface):
+        surface.blit(self.static_layer, (0, 0))
+
+        # Draw sliders and toggle
+        for slider in self.sliders:
+            slider.draw(surface)
+        self.training_mode_toggle.draw(surface)
 
     def get_values(self):
         return (
@@ -151,13 +168,28 @@ class SettingsMenu:
             self.learning_rate_slider.value,
         )
 
-    def save_training_results(self, model, file_path="ppo_flappy.zip"):
-        model.save(file_path)
-        print(f"Training results saved to {file_path}")
+    def save_training_results(self, checkpoints, policy, step, state=None):
+        # The CheckpointSaver writes the file in the background. Without a policy
+        # it saves state, weights loaded before any model existed.
+        if policy is not None:
+            checkpoints.save(policy, step)
+        elif state is not None:
+            checkpoints.save_state(state, step)
+        else:
+            # An untrained model would overwrite the exported autoplay policy
+            logger.warning("Nothing trained or loaded yet, not saving")
+            return
+        logger.info("Saving training results at step %d", step)
 
-    def load_training_results(self, model, file_path="ppo_flappy.zip"):
-        if os.path.exists(file_path):
-            model.load(file_path)
-            print(f"Training results loaded from {file_path}")
+    def load_training_results(
+        self, loader, directory="checkpoints", file_path="ppo_flappy.zip"
+    ):
+        # Newest checkpoint first, then the single file older versions saved
+        path = latest_checkpoint(directory)
+        if path is None and os.path.exists(file_path):
+            path = file_path
+        if path is not None:
+            loader.load(path)  # Weights are swapped in once the read finishes
+            logger.info("Loading training results from %s", path)
         else:
-            print(f"File {file_path} not found. Starting fresh.")
+            logger.warning("No checkpoint in %s. Starting fresh.", directory)
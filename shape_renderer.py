@@ -1,7 +1,22 @@
 import pygame
 import math
+from surface_cache import SurfaceCache
 
 class ShapeRenderer:
+    # Surfaces shared by key (shape, size, color)
+    _surface_cache = SurfaceCache(32)
+
+    @classmethod
+    def get_cached_surface(cls, key, create):
+        return cls._surface_cache.get(key, create)
+
+    @classmethod
+    def cached_rectangle_surface(cls, width, height, color):
+        return cls.get_cached_surface(
+            ("rectangle", width, height, color),
+            lambda: cls.create_rectangle_surface(width, height, color),
+        )
+
     @staticmethod
     def create_polygon_surface(points, color, width=0):
         # Calculate the bounding box of the polygon
@@ -52,4 +67,11 @@ class ShapeRenderer:
         surface = pygame.Surface((rect.width, rect.height), pygame.SRCALPHA)
         pygame.draw.arc(surface, color, (0, 0, rect.width, rect.height), math.radians(start_angle), math.radians(stop_angle), width)
         return surface
-    
\ No newline at end of file
+
+    @staticmethod
+    def create_rotation_atlas(surface, min_angle=-90, max_angle=90):
+        # One pre-rotated copy of the surface per whole degree in [min_angle, max_angle]
+        return [
+            pygame.transform.rotate(surface, angle)
+            for angle in range(min_angle, max_angle + 1)
+        ]
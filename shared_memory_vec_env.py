@@ -0,0 +1,217 @@
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+from flappy_env import FlappyEnv
+from simulation import Simulation
+from vec_flappy_env import FlappyVecEnvBase
+
+# Name, dtype and trailing shape of every buffer shared with the workers
+_BUFFER_LAYOUT = [
+    ("observations", np.float32, (11,)),
+    ("terminal_observations", np.float32, (11,)),
+    ("rewards", np.float32, ()),
+    ("dones", np.bool_, ()),
+    ("actions", np.int64, ()),
+]
+
+
+class _SharedBuffers:
+    def __init__(self, num_envs, names=None):
+        self.memory = {}
+        for name, dtype, shape in _BUFFER_LAYOUT:
+            full_shape = (num_envs,) + shape
+            if names is None:
+                size = int(np.prod(full_shape)) * np.dtype(dtype).itemsize
+                shm = shared_memory.SharedMemory(create=True, size=size)
+            else:
+                shm = shared_memory.SharedMemory(name=names[name])
+            self.memory[name] = shm
+            setattr(self, name, np.ndarray(full_shape, dtype=dtype, buffer=shm.buf))
+
+    def names(self):
+        return {name: shm.name for name, shm in self.memory.items()}
+
+    def close(self, unlink=False):
+        for name in self.memory:
+            setattr(self, name, None)  # Release the views before closing
+        for shm in self.memory.values():
+            shm.close()
+            if unlink:
+                shm.unlink()
+
+
+def _worker(
+    remote, buffer_names, num_envs, start, count, seed, sim_kwargs, action_repeat
+):
+    buffers = _SharedBuffers(num_envs, buffer_names)
+    envs = [
+        FlappyEnv(
+            Simulation(seed=None if seed is None else seed + start + i, **sim_kwargs),
+            action_repeat=action_repeat,
+        )
+        for i in range(count)
+    ]
+    try:
+        while True:
+            command, data = remote.recv()
+            result = None
+            if command == "step":
+                for i, env in enumerate(envs):
+                    j = start + i
+                    obs, reward, terminated, truncated, _ = env.step(
+                        int(buffers.actions[j])
+                    )
+                    done = terminated or truncated
+                    if done:
+                        buffers.terminal_observations[j] = obs
+                        obs, _ = env.reset()
+                    buffers.observations[j] = obs
+                    buffers.rewards[j] = reward
+                    buffers.dones[j] = done
+            elif command == "reset":
+                for i, env in enumerate(envs):
+                    buffers.observations[start + i], _ = env.reset()
+            elif command == "seed":
+                for i, env in enumerate(envs):
+                    # Takes effect from the next episode, like VecFlappyEnv.seed
+                    env.sim.seed_rng.seed(None if data is None else data + start + i)
+            elif command in ("get_attr", "set_attr", "env_method"):
+                # data is (name, global indices, args); reply for the envs held here
+                name, targets, args = data
+                result = []
+                for j in targets:
+                    if start <= j < start + count:
+                        env = envs[j - start]
+                        value = None
+                        if command == "get_attr":
+                            value = getattr(env, name)
+                        elif command == "set_attr":
+                            setattr(env, name, args)
+                        else:
+                            method_args, method_kwargs = args
+                            value = getattr(env, name)(*method_args, **method_kwargs)
+                        result.append((j, value))
+            elif command == "close":
+                break
+            # Step results are already in shared memory, only other replies are sent
+            remote.send(result)
+    finally:
+        buffers.close()
+        remote.close()
+
+
+class SharedMemoryVecEnv(FlappyVecEnvBase):
+    """Steps headless FlappyEnv games in worker processes.
+
+    Like SubprocVecEnv, but observations, rewards and dones are written into
+    shared memory by the workers, so only tiny command messages cross the pipes.
+    Extra keyword arguments configure every worker's Simulation. get_attr,
+    set_attr and env_method are forwarded to the workers' FlappyEnvs.
+    """
+
+    def __init__(
+        self,
+        num_workers,
+        envs_per_worker=1,
+        seed=None,
+        start_method=None,
+        action_repeat=None,
+        **sim_kwargs,
+    ):
+        num_envs = num_workers * envs_per_worker
+
+        if start_method is None:
+            # fork is unsafe once torch threads exist, as in SB3's SubprocVecEnv
+            methods = mp.get_all_start_methods()
+            start_method = "forkserver" if "forkserver" in methods else "spawn"
+        ctx = mp.get_context(start_method)
+
+        self.buffers = _SharedBuffers(num_envs)
+        self.remotes = []
+        self.processes = []
+        for worker in range(num_workers):
+            remote, worker_remote = ctx.Pipe()
+            process = ctx.Process(
+                target=_worker,
+                args=(
+                    worker_remote,
+                    self.buffers.names(),
+                    num_envs,
+                    worker * envs_per_worker,
+                    envs_per_worker,
+                    seed,
+                    sim_kwargs,
+                    action_repeat,
+                ),
+                daemon=True,
+            )
+            process.start()
+            worker_remote.close()
+            self.remotes.append(remote)
+            self.processes.append(process)
+        self.closed = False
+        # After the workers start, VecEnv.__init__ asks them for render_mode
+        super().__init__(num_envs)
+
+    def _broadcast(self, command, data=None):
+        for remote in self.remotes:
+            remote.send((command, data))
+
+    def _wait(self):
+        return [remote.recv() for remote in self.remotes]
+
+    def _call_envs(self, command, name, indices, args=None):
+        targets = list(self._get_indices(indices))
+        self._broadcast(command, (name, targets, args))
+        values = dict(pair for replies in self._wait() for pair in replies)
+        return [values[j] for j in targets]
+
+    def reset(self):
+        self._broadcast("reset")
+        self._wait()
+        return self.buffers.observations.copy()
+
+    def step_async(self, actions):
+        self.buffers.actions[:] = np.asarray(actions).reshape(self.num_envs)
+        self._broadcast("step")
+
+    def step_wait(self):
+        self._wait()
+        dones = self.buffers.dones.copy()
+        infos = [{} for _ in range(self.num_envs)]
+        for i in np.flatnonzero(dones):
+            infos[i]["terminal_observation"] = self.buffers.terminal_observations[i].copy()
+            infos[i]["TimeLimit.truncated"] = False
+        return (
+            self.buffers.observations.copy(),
+            self.buffers.rewards.copy(),
+            dones,
+            infos,
+        )
+
+    def close(self):
+        if self.closed:
+            return
+        self._broadcast("close")
+        for process in self.processes:
+            process.join()
+        self.buffers.close(unlink=True)
+        self.closed = True
+
+    def seed(self, seed=None):
+        self._broadcast("seed", seed)
+        self._wait()
+        if seed is None:
+            return [None] * self.num_envs
+        return [seed + i for i in range(self.num_envs)]
+
+    def get_attr(self, attr_name, indices=None):
+        return self._call_envs("get_attr", attr_name, indices)
+
+    def set_attr(self, attr_name, value, indices=None):
+        self._call_envs("set_attr", attr_name, indices, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        return self._call_envs(
+            "env_method", method_name, indices, (method_args, method_kwargs)
+        )
@@ -0,0 +1,260 @@
+import math
+import random
+from collections import deque
+
+TICK_RATE = 60  # Simulation ticks per second
+
+# "rect" tests the rotated sprite's bounds against every pipe near the bird,
+# "gap" tests a fixed hitbox against the one gap interval at the bird's x
+COLLISION_MODES = ("rect", "gap")
+
+
+def ms_to_ticks(ms):
+    return ms * TICK_RATE / 1000
+
+
+def rotated_bounds(width, height, angle):
+    """Return the size of the bounding box of a width x height box rotated by angle degrees."""
+    radians = math.radians(angle)
+    cos_a = abs(math.cos(radians))
+    sin_a = abs(math.sin(radians))
+    return width * cos_a + height * sin_a, width * sin_a + height * cos_a
+
+
+class BirdState:
+    def __init__(self, x, y, size=20):
+        self.x = x  # Center x
+        self.y = y  # Center y
+        self.prev_y = y  # Center y on the previous tick, for render interpolation
+        self.size = size
+        self.velocity = 0
+        self.angle = 0
+        self.width = size
+        self.height = size
+        self.last_jump_tick = -math.inf
+
+    @property
+    def left(self):
+        return self.x - self.width / 2
+
+    @property
+    def right(self):
+        return self.x + self.width / 2
+
+    @property
+    def top(self):
+        return self.y - self.height / 2
+
+    @property
+    def bottom(self):
+        return self.y + self.height / 2
+
+
+class PipePair:
+    def __init__(self, x, gap_top, gap, width):
+        self.x = x
+        self.prev_x = x  # x on the previous tick, for render interpolation
+        self.gap_top = gap_top  # Bottom edge of the top pipe
+        self.gap = gap
+        self.width = width
+        self.scored = False  # Flag to check if the bird has passed this pipe
+        self.trained = False  # Flag to check if the pipe has been trained on
+
+    @property
+    def right(self):
+        return self.x + self.width
+
+    @property
+    def gap_bottom(self):
+        return self.gap_top + self.gap
+
+
+class PipeQueue:
+    """Pipe pairs ordered from left to right.
+
+    Pipes spawn at the right edge and all move left at the same speed, so the
+    oldest pipe is always at the front and the newest at the back.
+    """
+
+    def __init__(self):
+        self._pipes = deque()
+
+    def __len__(self):
+        return len(self._pipes)
+
+    def __iter__(self):
+        return iter(self._pipes)
+
+    def __getitem__(self, index):
+        return self._pipes[index]
+
+    def append(self, pipe):
+        self._pipes.append(pipe)
+
+    def first(self):
+        return self._pipes[0] if self._pipes else None
+
+    def last(self):
+        return self._pipes[-1] if self._pipes else None
+
+    def move(self, dx):
+        for pipe in self._pipes:
+            pipe.prev_x = pipe.x
+            pipe.x += dx
+        # Pipes leave the screen in order, so only the front can be off screen
+        while self._pipes and self._pipes[0].right < 0:
+            self._pipes.popleft()
+
+    def next_pipe(self, left):
+        """Return the first pipe whose right edge is past left, or None."""
+        for pipe in self._pipes:
+            if pipe.right > left:
+                return pipe
+        return None
+
+    def overlapping(self, left, right):
+        """Yield the pipes whose x-range overlaps [left, right]."""
+        for pipe in self._pipes:
+            if pipe.x >= right:
+                break
+            if pipe.right > left:
+                yield pipe
+
+    def newly_passed(self, left):
+        """Yield unscored pipes whose right edge is behind left."""
+        for pipe in self._pipes:
+            if pipe.right >= left:
+                break
+            if not pipe.scored:
+                yield pipe
+
+
+class Simulation:
+    """Headless Flappy Polygon game state advanced one integer tick at a time."""
+
+    def __init__(
+        self,
+        width=400,
+        height=600,
+        seed=None,
+        gravity=0.5,
+        jump_strength=-7.8,
+        pipe_speed=2.4,
+        pipe_gap=250,
+        collision_mode="rect",
+    ):
+        if collision_mode not in COLLISION_MODES:
+            raise ValueError(f"Unknown collision mode: {collision_mode}")
+        self.collision_mode = collision_mode
+        self.width = width
+        self.height = height
+        self.gravity = gravity
+        self.jump_strength = jump_strength
+        self.pipe_speed = pipe_speed
+        self.pipe_gap = pipe_gap
+        self.pipe_width = 60
+        self.base_pipe_interval = 2000  # milliseconds at the base speed
+        self.jump_cooldown = ms_to_ticks(250)
+        # Every episode gets its own seed so it can be replayed on its own
+        self.seed_rng = random.Random(seed)
+        self.rng = random.Random()
+        self.recorder = None  # Optional ReplayRecorder notified of every tick
+        self.reset()
+
+    def reset(self, seed=None):
+        if seed is None:
+            seed = self.seed_rng.getrandbits(63)
+        self.episode_seed = seed
+        self.rng.seed(seed)
+        self.tick = 0
+        self.game_active = True
+        self.score = 0
+        self.bird = BirdState(50, self.height // 2)
+        self.pipes = PipeQueue()
+        self.last_pipe_tick = 0
+        self.hit_pipe = False
+
+    def pipe_interval(self):
+        """Return the number of ticks between pipe spawns at the current speed."""
+        base_speed = 3
+        return ms_to_ticks(self.base_pipe_interval * (base_speed / self.pipe_speed))
+
+    def can_jump(self):
+        """Return True if the bird can jump based on cooldown."""
+        return self.tick - self.bird.last_jump_tick >= self.jump_cooldown
+
+    def jump(self):
+        ticks_since_last_jump = self.tick - self.bird.last_jump_tick
+        if ticks_since_last_jump < self.jump_cooldown:
+            # Scale the jump strength based on the remaining cooldown time
+            scale_factor = ticks_since_last_jump / self.jump_cooldown
+            self.bird.velocity = self.jump_strength * scale_factor
+        else:
+            self.bird.velocity = self.jump_strength
+        self.bird.last_jump_tick = self.tick
+
+    def ticks_until_jump(self):
+        return max(0, self.jump_cooldown - (self.tick - self.bird.last_jump_tick))
+
+    def step(self, jump=False):
+        if jump:
+            self.jump()
+        self.tick += 1
+
+        self._update_bird()
+        self._spawn_pipes()
+        self._update_pipes()
+        self.hit_pipe = self.hits_pipe()
+        if self.hit_pipe or self.bird.top < 0 or self.bird.bottom > self.height:
+            self.game_active = False
+        self._update_score()
+        if self.recorder is not None:
+            self.recorder.record(jump)
+
+    def _update_bird(self):
+        bird = self.bird
+        bird.velocity += self.gravity
+        bird.prev_y = bird.y
+        bird.y += bird.velocity
+        bird.angle = -bird.velocity * 3
+        if self.collision_mode == "rect":
+            # The rendered sprite is the rotated bird, so its bounds grow with the angle
+            bird.width, bird.height = rotated_bounds(bird.size, bird.size, bird.angle)
+
+    def _spawn_pipes(self):
+        # Only spawn a new pipe if there's enough distance from the last pipe
+        if self.tick - self.last_pipe_tick > self.pipe_interval() and (
+            not self.pipes or self.width - self.pipes.last().right > 200
+        ):
+            self.last_pipe_tick = self.tick
+            gap_top = self.rng.randint(50, self.height - self.pipe_gap - 50)
+            self.pipes.append(
+                PipePair(self.width, gap_top, self.pipe_gap, self.pipe_width)
+            )
+
+    def _update_pipes(self):
+        self.pipes.move(-self.pipe_speed)
+
+    def hits_pipe(self):
+        bird = self.bird
+        if self.collision_mode == "gap":
+            # Pipes are 200px apart, so at most one pipe overlaps the bird's x
+            pipe = self.pipes.next_pipe(bird.left)
+            return (
+                pipe is not None
+                and pipe.x < bird.right
+                and not pipe.gap_top <= bird.top < bird.bottom <= pipe.gap_bottom
+            )
+        for pipe in self.pipes.overlapping(bird.left, bird.right):
+            if bird.top < pipe.gap_top or bird.bottom > pipe.gap_bottom:
+                return True
+        return False
+
+    def _update_score(self):
+        for pipe in self.pipes.newly_passed(self.bird.left):
+            pipe.scored = True
+            self.score += 1
+
+    def next_pipe(self):
+        """Return the closest pipe the bird has not passed yet, or None."""
+        return self.pipes.next_pipe(self.bird.left)
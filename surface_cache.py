@@ -0,0 +1,24 @@
+from collections import OrderedDict
+
+
+class SurfaceCache:
+    """Surfaces by key, evicting the least recently used beyond max_entries.
+
+    Callers share the returned surfaces, so they must not draw on them.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._surfaces = OrderedDict()
+
+    def get(self, key, create):
+        """Return the surface for key, calling create() to make it on a miss."""
+        surface = self._surfaces.get(key)
+        if surface is None:
+            surface = create()
+            self._surfaces[key] = surface
+            if len(self._surfaces) > self.max_entries:
+                self._surfaces.popitem(last=False)
+        else:
+            self._surfaces.move_to_end(key)
+        return surface
@@ -0,0 +1,225 @@
+import argparse
+import csv
+import itertools
+import json
+import math
+import multiprocessing as mp
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from training_log import configure_logging, logger
+
+GAME_PARAMETERS = ("gravity", "jump_strength", "pipe_speed", "pipe_gap")
+
+# Lists are grid choices; {"low", "high", "log"} ranges are only valid for --random
+DEFAULT_SPACE = {
+    "learning_rate": [1e-4, 3e-4, 1e-3],
+    "n_steps": [128, 256],
+    "gamma": [0.99, 0.995],
+    "ent_coef": [0.0, 0.01],
+    "jump_strength": [-7.8, -9.0],
+    "pipe_speed": [2.4, 3.0],
+    "pipe_gap": [200, 250],
+}
+
+
+def grid_configs(space):
+    names = list(space)
+    for values in itertools.product(*(space[name] for name in names)):
+        yield dict(zip(names, values))
+
+
+def random_configs(space, count, seed=None):
+    rng = random.Random(seed)
+    for _ in range(count):
+        config = {}
+        for name, choices in space.items():
+            if isinstance(choices, dict):
+                low, high = choices["low"], choices["high"]
+                if choices.get("log"):
+                    value = math.exp(rng.uniform(math.log(low), math.log(high)))
+                else:
+                    value = rng.uniform(low, high)
+                config[name] = round(value) if isinstance(low, int) else value
+            else:
+                config[name] = rng.choice(choices)
+        yield config
+
+
+def _early_stopping_callback(patience, min_timesteps):
+    from stable_baselines3.common.callbacks import BaseCallback
+
+    class EarlyStopping(BaseCallback):
+        """Stops training when the mean episode return stops improving."""
+
+        def __init__(self):
+            super().__init__()
+            self.best = -np.inf
+            self.stale_rollouts = 0
+            self.stopped_early = False
+
+        def _on_step(self):
+            return not self.stopped_early
+
+        def _on_rollout_end(self):
+            episodes = self.model.ep_info_buffer
+            if not episodes or self.num_timesteps < min_timesteps:
+                return
+            mean_return = np.mean([episode["r"] for episode in episodes])
+            if mean_return > self.best:
+                self.best = mean_return
+                self.stale_rollouts = 0
+            else:
+                self.stale_rollouts += 1
+                self.stopped_early = self.stale_rollouts >= patience
+
+    return EarlyStopping()
+
+
+def evaluate(policy, config, episodes, max_steps, seed):
+    """Mean and max score of the deterministic policy on fresh games."""
+    from flappy_env import DECISION_INTERVAL, FlappyEnv
+    from simulation import Simulation
+
+    game = {name: config[name] for name in GAME_PARAMETERS if name in config}
+    env = FlappyEnv(Simulation(seed=seed, **game), action_repeat=DECISION_INTERVAL)
+    scores = []
+    for _ in range(episodes):
+        obs, _ = env.reset()
+        for _ in range(max_steps):
+            obs, _, terminated, truncated, _ = env.step(policy.predict(obs))
+            if terminated or truncated:
+                break
+        scores.append(env.sim.score)
+    return float(np.mean(scores)), max(scores)
+
+
+def run_trial(trial, config, args):
+    """Train and evaluate one configuration; runs in a pool process."""
+    import torch
+    from stable_baselines3 import PPO
+    from stable_baselines3.common.vec_env import VecMonitor
+    from flappy_env import DECISION_INTERVAL
+    from numpy_policy import NumpyPolicy
+    from vec_flappy_env import VecFlappyEnv
+
+    # Trials already fill every core, one torch thread each avoids oversubscription
+    torch.set_num_threads(1)
+    start = time.perf_counter()
+    seed = args.seed + trial
+    game = {name: config[name] for name in GAME_PARAMETERS if name in config}
+    ppo = {name: value for name, value in config.items() if name not in GAME_PARAMETERS}
+    env = VecMonitor(
+        VecFlappyEnv(args.num_envs, seed=seed, action_repeat=DECISION_INTERVAL, **game)
+    )
+    model = PPO("MlpPolicy", env, verbose=0, seed=seed, device="cpu", **ppo)
+    callback = _early_stopping_callback(args.patience, args.timesteps * args.warmup)
+    model.learn(total_timesteps=args.timesteps, callback=callback)
+
+    policy = NumpyPolicy.from_sb3(model.policy)
+    mean_score, max_score = evaluate(
+        policy, config, args.eval_episodes, args.eval_max_steps, seed
+    )
+    returns = [episode["r"] for episode in model.ep_info_buffer]
+    return {
+        "trial": trial,
+        **config,
+        "mean_score": mean_score,
+        "max_score": max_score,
+        "mean_return": float(np.mean(returns)) if returns else None,
+        "timesteps": model.num_timesteps,
+        "stopped_early": callback.stopped_early,
+        "seconds": round(time.perf_counter() - start, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Headless PPO hyperparameter and game parameter sweep"
+    )
+    parser.add_argument(
+        "--space",
+        help="JSON file mapping parameters to choice lists or {low, high, log} ranges",
+    )
+    parser.add_argument(
+        "--random",
+        type=int,
+        default=0,
+        help="Sample this many configs instead of the grid",
+    )
+    parser.add_argument("--timesteps", type=int, default=200_000, help="Per trial")
+    parser.add_argument("--num-envs", type=int, default=8, help="Games per trial")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument(
+        "--patience",
+        type=int,
+        default=10,
+        help="Rollouts without improvement before stopping",
+    )
+    parser.add_argument(
+        "--warmup", type=float, default=0.2, help="Fraction of timesteps before stopping"
+    )
+    parser.add_argument("--eval-episodes", type=int, default=10)
+    parser.add_argument("--eval-max-steps", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="sweep_results.csv")
+    args = parser.parse_args()
+    configure_logging()
+
+    space = DEFAULT_SPACE
+    if args.space:
+        with open(args.space) as f:
+            space = json.load(f)
+    if args.random:
+        configs = list(random_configs(space, args.random, args.seed))
+    else:
+        configs = list(grid_configs(space))
+    logger.info("Running %d trials on %d workers", len(configs), args.workers)
+
+    fields = ["trial", *space, "mean_score", "max_score", "mean_return"]
+    fields += ["timesteps", "stopped_early", "seconds", "error"]
+    results = []
+    # fork is unsafe once torch threads exist, as in SharedMemoryVecEnv
+    methods = mp.get_all_start_methods()
+    context = mp.get_context("forkserver" if "forkserver" in methods else "spawn")
+    # Rows are written as trials finish, so an interrupted sweep keeps its results
+    with open(args.output, "w", newline="") as f, ProcessPoolExecutor(
+        max_workers=args.workers, mp_context=context
+    ) as pool:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        futures = {
+            pool.submit(run_trial, trial, config, args): (trial, config)
+            for trial, config in enumerate(configs)
+        }
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as error:
+                # One bad configuration must not lose the rest of the sweep
+                trial, config = futures[future]
+                logger.exception("Trial %d failed: %s", trial, config)
+                writer.writerow({"trial": trial, **config, "error": repr(error)})
+                f.flush()
+                continue
+            results.append(result)
+            writer.writerow(result)
+            f.flush()
+            logger.info(
+                "Trial %d: mean score %.1f after %d steps%s",
+                result["trial"],
+                result["mean_score"],
+                result["timesteps"],
+                " (stopped early)" if result["stopped_early"] else "",
+            )
+
+    results.sort(key=lambda result: result["mean_score"], reverse=True)
+    for result in results[:5]:
+        config = {name: result[name] for name in space}
+        logger.info("Mean score %.1f: %s", result["mean_score"], config)
+
+
+if __name__ == "__main__":
+    main()
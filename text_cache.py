@@ -0,0 +1,104 @@
+import pygame
+from surface_cache import SurfaceCache
+
+
+class TextCache:
+    """Rendered text surfaces for one font, keyed by text and color."""
+
+    def __init__(self, font, max_entries=256):
+        self.font = font
+        self._surfaces = SurfaceCache(max_entries)
+
+    def render(self, text, color):
+        return self._surfaces.get(
+            (text, color), lambda: self.font.render(text, True, color)
+        )
+
+
+class GlyphAtlas:
+    """Pre-rendered glyphs for the characters used in numeric values."""
+
+    characters = "0123456789.-+e/%[], "
+
+    def __init__(self, font, color):
+        self.glyphs = {char: font.render(char, True, color) for char in self.characters}
+        self.widths = {char: glyph.get_width() for char, glyph in self.glyphs.items()}
+        self.max_width = max(self.widths.values())
+        self.height = font.get_height()
+
+    def supports(self, text):
+        return all(char in self.glyphs for char in text)
+
+    def text_width(self, text):
+        return sum(self.widths[char] for char in text)
+
+
+class NumberText:
+    """A line of numeric text composited from a GlyphAtlas.
+
+    Only the characters that differ from the previous value are redrawn, plus
+    the ones after a character whose width changed. Digits usually share one
+    width, so a counter ticking up redraws just its last digits. Text with
+    characters outside the atlas falls back to the TextCache.
+    """
+
+    def __init__(self, atlas, text_cache, color, max_chars=12):
+        self.atlas = atlas
+        self.text_cache = text_cache
+        self.color = color
+        self.text = ""
+        self.image = self._create_surface(max_chars)
+        self._fallback = None
+
+    def _create_surface(self, max_chars):
+        return pygame.Surface(
+            (self.atlas.max_width * max_chars, self.atlas.height), pygame.SRCALPHA
+        )
+
+    def set_text(self, text):
+        if text == self.text:
+            return
+        if not self.atlas.supports(text):
+            self.text = text
+            self._fallback = self.text_cache.render(text, self.color)
+            return
+        if self._fallback is not None:
+            # The surface is stale after showing fallback text, redraw every cell
+            self._fallback = None
+            self.text = ""
+            self.image.fill((0, 0, 0, 0))
+
+        widths = self.atlas.widths
+        if self.atlas.text_width(text) > self.image.get_width():
+            self.image = self._create_surface(len(text))
+            old_text = ""
+        else:
+            old_text = self.text
+        x = 0
+        shifted = False  # Everything after a width change moves and must be redrawn
+        for old, new in zip(old_text, text):
+            shifted = shifted or widths[old] != widths[new]
+            if shifted or old != new:
+                cell_rect = pygame.Rect(x, 0, widths[new], self.atlas.height)
+                self.image.fill((0, 0, 0, 0), cell_rect)
+                self.image.blit(self.atlas.glyphs[new], cell_rect)
+            x += widths[new]
+        for new in text[len(old_text):]:
+            cell_rect = pygame.Rect(x, 0, widths[new], self.atlas.height)
+            self.image.fill((0, 0, 0, 0), cell_rect)
+            self.image.blit(self.atlas.glyphs[new], cell_rect)
+            x += widths[new]
+        # Clear what is left of a longer previous value
+        old_width = self.atlas.text_width(old_text)
+        if old_width > x:
+            self.image.fill((0, 0, 0, 0), (x, 0, old_width - x, self.atlas.height))
+        self.text = text
+
+    def draw(self, surface, position):
+        image = self.image if self._fallback is None else self._fallback
+        surface.blit(image, position)
+
+    def get_width(self):
+        if self._fallback is not None:
+            return self._fallback.get_width()
+        return self.atlas.text_width(self.text)
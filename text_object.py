@@ -1,11 +1,13 @@
 import pygame
 
-class TextObject:
-    def __init__(self, text, font, x, y, color=(255, 0, 0), center=False):
+class TextObject(pygame.sprite.DirtySprite):
+    def __init__(self, text, font, x, y, color=(255, 0, 0), center=False, text_cache=None):
+        super().__init__()
         self.text = text
         self.font = font
         self.color = color
-        self.image = self.font.render(self.text, True, self.color)
+        self.text_cache = text_cache  # Optional TextCache shared by texts using this font
+        self.image = self.render(self.text)
         self.rect = self.image.get_rect()
         self.center = center
         if center:
@@ -15,7 +17,7 @@ class TextObject:
 
     def update_text(self, new_text):
         self.text = new_text
-        self.image = self.font.render(self.text, True, self.color)
+        self.image = self.render(self.text)
         # Update rect size if text length changes
         old_rect = self.rect
         self.rect = self.image.get_rect()
@@ -23,6 +25,12 @@ class TextObject:
             self.rect.center = old_rect.center
         else:
             self.rect.topleft = old_rect.topleft
+        self.dirty = 1
+
+    def render(self, text):
+        if self.text_cache is not None:
+            return self.text_cache.render(text, self.color)
+        return self.font.render(text, True, self.color)
 
     def draw(self, surface):
         surface.blit(self.image, self.rect)
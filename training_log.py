@@ -0,0 +1,94 @@
+import json
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger("flappy_polygon")
+
+
+def configure_logging(level=logging.INFO):
+    logging.basicConfig(
+        level=level, format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+    )
+
+
+class JsonlSink:
+    """Appends records to a JSON Lines file from a background thread."""
+
+    def __init__(self, path):
+        self.path = path
+        self._queue = queue.SimpleQueue()
+        self._file = open(path, "a")
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def write(self, record):
+        self._queue.put(record)
+
+    def _run(self):
+        while True:
+            record = self._queue.get()
+            if record is None:
+                break
+            self._file.write(json.dumps(record) + "\n")
+            if self._queue.empty():
+                self._file.flush()
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+        self._file.close()
+
+
+class StepLogger:
+    """Aggregates per-step actions and rewards into one summary every N steps.
+
+    record() only updates counters; formatting and I/O happen once per summary.
+    """
+
+    def __init__(self, name, summary_interval=1000, sink=None):
+        self.name = name
+        self.summary_interval = summary_interval
+        self.sink = sink
+        self.total_steps = 0
+        self._reset_counters()
+
+    def _reset_counters(self):
+        self.steps = 0
+        self.jumps = 0
+        self.reward_sum = 0.0
+        self.episodes = 0
+
+    def record(self, action, reward, done):
+        self.steps += 1
+        self.jumps += int(action == 1)
+        self.reward_sum += float(reward)
+        self.episodes += int(done)
+        if self.steps >= self.summary_interval:
+            self.flush()
+
+    def flush(self):
+        if self.steps == 0:
+            return
+        self.total_steps += self.steps
+        summary = {
+            "source": self.name,
+            "time": time.time(),
+            "total_steps": self.total_steps,
+            "steps": self.steps,
+            "jump_fraction": self.jumps / self.steps,
+            "mean_reward": self.reward_sum / self.steps,
+            "episodes": self.episodes,
+        }
+        logger.info(
+            "%s: %d steps, jump %.1f%%, mean reward %.3f, %d episodes ended",
+            self.name,
+            self.total_steps,
+            summary["jump_fraction"] * 100,
+            summary["mean_reward"],
+            self.episodes,
+        )
+        if self.sink is not None:
+            self.sink.write(summary)
+        self._reset_counters()
@@ -1,5 +1,6 @@
 from typing import Dict
 import pygame
+from text_cache import GlyphAtlas, NumberText, TextCache
 
 
 class TrainingUI:
@@ -7,6 +8,11 @@ class TrainingUI:
         self.width = width
         self.height = height
         self.font = pygame.font.SysFont(None, 24)
+        self.text_color = (255, 255, 255)
+        self.text_cache = TextCache(self.font)
+        self.glyph_atlas = GlyphAtlas(self.font, self.text_color)
+        self.value_texts = {}  # Label -> NumberText
+        self.steps_text = NumberText(self.glyph_atlas, self.text_cache, self.text_color)
         self.current_step = 0
         self.training_steps = 0
         self.observations = {}  # Placeholder for observed values
@@ -29,7 +35,7 @@ class TrainingUI:
     ):
         self.observations = observations
         self.current_score = current_score
-        self.action_history.append(action)
+        self.action_history.append(int(action))
         if len(self.action_history) > 10:  # Limit history to last 10 actions
             self.action_history.pop(0)
 
@@ -42,6 +48,17 @@ class TrainingUI:
                 self.highest_score = self.current_score
             self.current_score = 0
 
+    def draw_value(self, screen, label, value_text, position):
+        # Static labels come from the cache, values are composited from glyphs
+        label_surface = self.text_cache.render(label, self.text_color)
+        screen.blit(label_surface, position)
+        number = self.value_texts.get(label)
+        if number is None:
+            number = NumberText(self.glyph_atlas, self.text_cache, self.text_color)
+            self.value_texts[label] = number
+        number.set_text(value_text)
+        number.draw(screen, (position[0] + label_surface.get_width(), position[1]))
+
     def draw(self, screen):
         # Draw training progress bar
         pygame.draw.rect(
@@ -50,44 +67,37 @@ class TrainingUI:
         pygame.draw.rect(
             screen, (255, 0, 0), (50, 50, (self.width - 100) * self.progress, 30)
         )  # Progress fill
-        progress_text = self.font.render(
-            f"Training Progress: {self.progress * 100:.2f}%", True, (255, 255, 255)
+        self.draw_value(
+            screen, "Training Progress: ", f"{self.progress * 100:.2f}%", (50, 90)
         )
-        screen.blit(progress_text, (50, 90))
 
         # Display current step and total steps inside the progress bar
-        steps_text = self.font.render(
-            f"{self.current_step} / {self.training_steps}", True, (255, 255, 255)
+        self.steps_text.set_text(f"{self.current_step} / {self.training_steps}")
+        text_rect = pygame.Rect(
+            0, 0, self.steps_text.get_width(), self.glyph_atlas.height
         )
-        text_rect = steps_text.get_rect(center=((self.width - 100) / 2 + 50, 65))
-        screen.blit(steps_text, text_rect)
+        text_rect.center = ((self.width - 100) / 2 + 50, 65)
+        self.steps_text.draw(screen, text_rect.topleft)
 
         # Display observations
         y_offset = 140
         for key, value in self.observations.items():
-            obs_text = self.font.render(f"{key}: {value:.3f}", True, (255, 255, 255))
-            screen.blit(obs_text, (50, y_offset))
+            self.draw_value(screen, f"{key}: ", f"{value:.3f}", (50, y_offset))
             y_offset += 30
 
         # Display scores and action history
-        score_text = self.font.render(
-            f"Current Score: {self.current_score}", True, (255, 255, 255)
+        self.draw_value(
+            screen, "Current Score: ", f"{self.current_score}", (50, y_offset)
         )
-        screen.blit(score_text, (50, y_offset))
         y_offset += 30
-        highest_score_text = self.font.render(
-            f"Highest Score: {self.highest_score}", True, (255, 255, 255)
+        self.draw_value(
+            screen, "Highest Score: ", f"{self.highest_score}", (50, y_offset)
         )
-        screen.blit(highest_score_text, (50, y_offset))
         y_offset += 30
-        total_score_text = self.font.render(
-            f"Total Score: {self.total_score}", True, (255, 255, 255)
-        )
-        screen.blit(total_score_text, (50, y_offset))
+        self.draw_value(screen, "Total Score: ", f"{self.total_score}", (50, y_offset))
         y_offset += 30
 
         # Display recent action history
-        action_text = self.font.render(
-            f"Recent Actions: {self.action_history}", True, (255, 255, 255)
+        self.draw_value(
+            screen, "Recent Actions: ", f"{self.action_history}", (50, y_offset)
         )
-        screen.blit(action_text, (50, y_offset))
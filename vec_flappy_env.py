@@ -0,0 +1,319 @@
+from gymnasium import spaces
+import numpy as np
+from stable_baselines3.common.vec_env import VecEnv
+from flappy_env import DECISION_INTERVAL
+from simulation import COLLISION_MODES, TICK_RATE, ms_to_ticks
+
+
+class FlappyVecEnvBase(VecEnv):
+    """Spaces and unwrapped-env answers shared by the headless Flappy VecEnvs."""
+
+    render_mode = None  # Headless, read by VecEnv.__init__
+
+    def __init__(self, num_envs):
+        observation_space = spaces.Box(
+            low=-np.inf, high=np.inf, shape=(11,), dtype=np.float32
+        )
+        action_space = spaces.Discrete(2)  # 0 for no action, 1 for jump
+        super().__init__(num_envs, observation_space, action_space)
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False] * len(self._get_indices(indices))
+
+
+class VecFlappyEnv(FlappyVecEnvBase):
+    """N independent Flappy Polygon games stepped together with NumPy arrays.
+
+    Mirrors the physics of Simulation and the observation and reward of
+    FlappyEnv, with every per-game quantity stored as one array entry.
+    action_repeat works as in FlappyEnv. The games are not separate objects,
+    so get_attr, set_attr and env_method act on this env for every index.
+    """
+
+    def __init__(
+        self,
+        num_envs,
+        width=400,
+        height=600,
+        seed=None,
+        gravity=0.5,
+        jump_strength=-7.8,
+        pipe_speed=2.4,
+        pipe_gap=250,
+        collision_mode="rect",
+        action_repeat=None,
+    ):
+        if collision_mode not in COLLISION_MODES:
+            raise ValueError(f"Unknown collision mode: {collision_mode}")
+        self.collision_mode = collision_mode
+        super().__init__(num_envs)
+
+        self.width = width
+        self.height = height
+        self.gravity = gravity
+        self.jump_strength = jump_strength
+        self.pipe_speed = pipe_speed
+        self.pipe_gap = pipe_gap
+        self.pipe_width = 60
+        self.base_pipe_interval = 2000
+        self.min_pipe_spacing = 200  # Free pixels between consecutive pipes
+        self.jump_cooldown = ms_to_ticks(250)
+        self.bird_x = 50
+        self.bird_size = 20
+        self.action_repeat = action_repeat
+        self.decision_interval = DECISION_INTERVAL
+        self.rng = np.random.default_rng(seed)
+
+        self.max_pipes = self.pipe_capacity()
+        n, p = num_envs, self.max_pipes
+        # Bird state
+        self.tick = np.zeros(n, dtype=np.int64)
+        self.bird_y = np.zeros(n, dtype=np.float64)
+        self.bird_velocity = np.zeros(n, dtype=np.float64)
+        self.last_jump_tick = np.zeros(n, dtype=np.float64)
+        self.last_decision_tick = np.zeros(n, dtype=np.int64)
+        self.score = np.zeros(n, dtype=np.int64)
+        # Pipe state, one slot per possible pipe pair
+        self.pipe_x = np.zeros((n, p), dtype=np.float64)
+        self.pipe_gap_top = np.zeros((n, p), dtype=np.float64)
+        self.pipe_active = np.zeros((n, p), dtype=bool)
+        self.pipe_scored = np.zeros((n, p), dtype=bool)
+        self.last_pipe_tick = np.zeros(n, dtype=np.int64)
+
+        self.current_steps = 0
+        self._actions = np.zeros(n, dtype=np.int64)
+        self._reset_envs(np.ones(n, dtype=bool))
+
+    def pipe_interval(self):
+        base_speed = 3
+        return ms_to_ticks(self.base_pipe_interval * (base_speed / self.pipe_speed))
+
+    def pipe_capacity(self):
+        """Most pipes one game can hold, counting the one being spawned.
+
+        Pipes live from x = width until their right edge passes 0, and
+        consecutive pipes are more than the spawn spacing apart.
+        """
+        spacing = max(
+            self.min_pipe_spacing + self.pipe_width,
+            self.pipe_interval() * self.pipe_speed,
+        )
+        return int((self.width + self.pipe_width) // spacing) + 1
+
+    def _reset_envs(self, mask):
+        self.tick[mask] = 0
+        self.bird_y[mask] = self.height // 2
+        self.bird_velocity[mask] = 0
+        self.last_jump_tick[mask] = -np.inf
+        self.last_decision_tick[mask] = -self.decision_interval
+        self.score[mask] = 0
+        self.pipe_active[mask] = False
+        self.pipe_scored[mask] = False
+        self.last_pipe_tick[mask] = 0
+
+    def _bird_half_extent(self):
+        if self.collision_mode == "gap":
+            return np.full(self.num_envs, self.bird_size / 2)
+        # Half size of the rotated bird's bounding box (the bird is square)
+        angle = np.radians(-self.bird_velocity * 3)
+        return self.bird_size / 2 * (np.abs(np.cos(angle)) + np.abs(np.sin(angle)))
+
+    def reset(self):
+        self._reset_envs(np.ones(self.num_envs, dtype=bool))
+        return self._get_observations()
+
+    def seed(self, seed=None):
+        self.rng = np.random.default_rng(seed)
+        return [seed] * self.num_envs
+
+    def step_async(self, actions):
+        self._actions = np.asarray(actions).reshape(self.num_envs)
+
+    def step_wait(self):
+        can_jump = self.tick - self.last_jump_tick >= self.jump_cooldown
+        if self.action_repeat is None:
+            # Only apply the action every decision interval, as FlappyEnv does
+            decide = self.tick - self.last_decision_tick >= self.decision_interval
+            self.last_decision_tick[decide] = self.tick[decide]
+            self.current_steps += int(decide.sum())
+            jump = decide & (self._actions == 1) & can_jump
+            observations, rewards, dones = self._tick(jump)
+            terminal_observations = observations
+        else:
+            self.current_steps += self.num_envs
+            jump = (self._actions == 1) & can_jump
+            rewards = np.zeros(self.num_envs)
+            dones = np.zeros(self.num_envs, dtype=bool)
+            terminal_observations = np.empty((self.num_envs, 11), dtype=np.float32)
+            for _ in range(self.action_repeat):
+                observations, tick_rewards, tick_dones = self._tick(jump)
+                jump = np.zeros(self.num_envs, dtype=bool)
+                # Games that ended keep running until the transition is over,
+                # but only ticks up to their end count
+                rewards += np.where(dones, 0, tick_rewards)
+                ended = tick_dones & ~dones
+                terminal_observations[ended] = observations[ended]
+                dones |= tick_dones
+                if dones.all():
+                    break
+
+        infos = [{} for _ in range(self.num_envs)]
+        if dones.any():
+            for i in np.flatnonzero(dones):
+                infos[i]["terminal_observation"] = terminal_observations[i].copy()
+                infos[i]["TimeLimit.truncated"] = False
+            self._reset_envs(dones)
+            observations[dones] = self._get_observations()[dones]
+
+        return observations, rewards.astype(np.float32), dones, infos
+
+    def _tick(self, jump):
+        """Advance every game by one tick; returns observations, rewards and dones."""
+        self.bird_velocity[jump] = self.jump_strength
+        self.last_jump_tick[jump] = self.tick[jump]
+
+        self.tick += 1
+
+        # Bird physics
+        self.bird_velocity += self.gravity
+        self.bird_y += self.bird_velocity
+        half = self._bird_half_extent()
+        bird_top = self.bird_y - half
+        bird_bottom = self.bird_y + half
+        bird_left = self.bird_x - half
+        bird_right = self.bird_x + half
+
+        self._spawn_pipes()
+
+        # Move pipes and drop the ones that left the screen
+        self.pipe_x[self.pipe_active] -= self.pipe_speed
+        pipe_right = self.pipe_x + self.pipe_width
+        self.pipe_active &= pipe_right >= 0
+
+        # Collisions
+        overlaps_x = (
+            self.pipe_active
+            & (bird_right[:, None] > self.pipe_x)
+            & (bird_left[:, None] < pipe_right)
+        )
+        outside_gap = (bird_top[:, None] < self.pipe_gap_top) | (
+            bird_bottom[:, None] > self.pipe_gap_top + self.pipe_gap
+        )
+        hit_pipe = (overlaps_x & outside_gap).any(axis=1)
+        out_of_bounds = (bird_top < 0) | (bird_bottom > self.height)
+        dones = hit_pipe | out_of_bounds
+
+        # Scoring
+        cleared = self.pipe_active & ~self.pipe_scored & (pipe_right < bird_left[:, None])
+        self.pipe_scored |= cleared
+        cleared_count = cleared.sum(axis=1)
+        self.score += cleared_count
+
+        observations = self._get_observations()
+        rewards = self._calculate_rewards(
+            observations, cleared_count, hit_pipe, bird_top, bird_bottom
+        )
+        return observations, rewards, dones
+
+    def _spawn_pipes(self):
+        last_right = np.where(
+            self.pipe_active, self.pipe_x + self.pipe_width, -np.inf
+        ).max(axis=1)
+        has_pipes = self.pipe_active.any(axis=1)
+        spawn = (self.tick - self.last_pipe_tick > self.pipe_interval()) & (
+            ~has_pipes | (self.width - last_right > self.min_pipe_spacing)
+        )
+        if not spawn.any():
+            return
+        envs = np.flatnonzero(spawn)
+        free = ~self.pipe_active[envs]
+        if not free.any(axis=1).all():
+            # Only possible if the spacing shrank after pipe_capacity() was sized
+            raise RuntimeError(f"All {self.max_pipes} pipe slots are in use")
+        slots = np.argmax(free, axis=1)  # First free slot
+        self.last_pipe_tick[envs] = self.tick[envs]
+        self.pipe_x[envs, slots] = self.width
+        self.pipe_gap_top[envs, slots] = self.rng.integers(
+            50, self.height - self.pipe_gap - 50, size=len(envs), endpoint=True
+        )
+        self.pipe_active[envs, slots] = True
+        self.pipe_scored[envs, slots] = False
+
+    def _next_pipe(self, bird_left):
+        """Return the slot of the closest upcoming pipe per env and whether one exists."""
+        pipe_right = self.pipe_x + self.pipe_width
+        upcoming = self.pipe_active & (pipe_right > bird_left[:, None])
+        slots = np.argmin(np.where(upcoming, pipe_right, np.inf), axis=1)
+        return slots, upcoming.any(axis=1)
+
+    def _get_observations(self):
+        h = self.height
+        half = self._bird_half_extent()
+        bird_top = self.bird_y - half
+        bird_bottom = self.bird_y + half
+        bird_left = self.bird_x - half
+        angle = -self.bird_velocity * 3
+
+        slots, has_next = self._next_pipe(bird_left)
+        rows = np.arange(self.num_envs)
+        gap_top_y = np.where(has_next, self.pipe_gap_top[rows, slots] / h, 0.3)
+        gap_bottom_y = np.where(has_next, gap_top_y + self.pipe_gap / h, 0.7)
+        pipe_distance_ratio = np.where(
+            has_next, (self.pipe_x[rows, slots] - bird_left) / self.width, 1.0
+        )
+        gap_center_y = np.where(has_next, (gap_top_y + gap_bottom_y) / 2, 0.5)
+        ticks_until_jump = np.maximum(
+            0, self.jump_cooldown - (self.tick - self.last_jump_tick)
+        )
+        is_in_gap = (self.bird_y > gap_top_y * h) & (self.bird_y < gap_bottom_y * h)
+
+        obs = np.empty((self.num_envs, 11), dtype=np.float32)
+        obs[:, 0] = bird_top / h
+        obs[:, 1] = self.bird_velocity / 10
+        obs[:, 2] = (angle + 90) / 180
+        obs[:, 3] = bird_top / h
+        obs[:, 4] = (h - bird_bottom) / h
+        obs[:, 5] = pipe_distance_ratio
+        obs[:, 6] = gap_top_y
+        obs[:, 7] = gap_bottom_y
+        obs[:, 8] = ticks_until_jump / TICK_RATE
+        obs[:, 9] = self.bird_y / h - gap_center_y
+        obs[:, 10] = is_in_gap
+        return obs
+
+    def _calculate_rewards(self, observations, cleared_count, hit_pipe, bird_top, bird_bottom):
+        h = self.height
+        has_pipes = self.pipe_active.any(axis=1)
+        rewards = np.full(self.num_envs, 0.5)  # Survival reward
+
+        # Rewards and penalties that apply while pipes are on screen
+        pipe_rewards = 5.0 * cleared_count
+        pipe_rewards -= 10.0 * hit_pipe
+        pipe_rewards -= 15.0 * ((bird_top <= 0) | (bird_bottom >= h))
+        border = 0.2 * h
+        near_top = bird_top < border
+        near_bottom = ~near_top & (bird_bottom > h - border)
+        pipe_rewards -= np.where(near_top, 0.1 * np.exp((border - bird_top) / border), 0)
+        pipe_rewards -= np.where(
+            near_bottom, 0.1 * np.exp((bird_bottom - (h - border)) / border), 0
+        )
+        pipe_rewards += observations[:, 10]
+
+        # Reward for staying in the middle when no pipes are on screen
+        middle_rewards = np.where(np.abs(self.bird_y - h / 2) < 0.15 * h, 0.1, 0)
+
+        rewards += np.where(has_pipes, pipe_rewards, middle_rewards)
+        return rewards
+
+    def close(self):
+        pass
+
+    def get_attr(self, attr_name, indices=None):
+        return [getattr(self, attr_name)] * len(self._get_indices(indices))
+
+    def set_attr(self, attr_name, value, indices=None):
+        setattr(self, attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        method = getattr(self, method_name)
+        return [method(*method_args, **method_kwargs)] * len(self._get_indices(indices))